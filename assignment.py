@@ -0,0 +1,215 @@
+"""Assigning interview slots to many candidates who share interviewers.
+
+Picking slots first-come fragments the interviewers' calendars and starves
+later candidates. ``assign_slots`` instead works on the free intervals
+produced by the availability engine and solves all candidates at once:
+
+1. Each interviewer's free time is tiled into back-to-back blocks of the
+   interview duration, so assigned interviews pack together without gaps.
+2. Candidates are matched to compatible blocks by maximum bipartite matching
+   (Hopcroft-Karp), seeded with a greedy pass that places the most constrained
+   candidates first and prefers early blocks ("pack") or the least loaded
+   interviewer ("spread").
+3. Candidates left over (their availability doesn't line up with a block) get
+   the earliest remaining start on the usual 5-minute grid.
+
+Candidates with different durations are solved one duration group at a time,
+longest first, each group seeing only the time earlier groups left free.
+"""
+from bisect import bisect_right
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import timedelta
+
+from availability import SLOT_INCREMENT_MINUTES, merge_busy_intervals
+
+
+@dataclass
+class Assignment:
+    candidate: str
+    interviewer: str
+    start: object
+    end: object
+
+
+class _IntervalSet:
+    """Sorted, disjoint free intervals with O(log n) containment checks"""
+
+    def __init__(self, intervals):
+        self.intervals = merge_busy_intervals(intervals)
+        self.starts = [interval["start"] for interval in self.intervals]
+
+    def contains(self, start, end):
+        index = bisect_right(self.starts, start) - 1
+        return index >= 0 and self.intervals[index]["end"] >= end
+
+    def remove(self, start, end):
+        remaining = []
+        for interval in self.intervals:
+            if interval["end"] <= start or end <= interval["start"]:
+                remaining.append(interval)
+                continue
+            if interval["start"] < start:
+                remaining.append({"start": interval["start"], "end": start})
+            if end < interval["end"]:
+                remaining.append({"start": end, "end": interval["end"]})
+        self.__init__(remaining)
+
+
+def _tile(free, duration):
+    """Back-to-back blocks of ``duration`` from the start of every free interval"""
+    blocks = []
+    for interval in free.intervals:
+        start = interval["start"]
+        while start + duration <= interval["end"]:
+            blocks.append((start, start + duration))
+            start += duration
+    return blocks
+
+
+def _hopcroft_karp(adjacency, match_left, match_right):
+    """Grow the given matching to a maximum one; adjacency maps left -> right nodes"""
+    infinity = float("inf")
+
+    def bfs():
+        distance = {}
+        queue = deque()
+        for left in adjacency:
+            if match_left.get(left) is None:
+                distance[left] = 0
+                queue.append(left)
+        found = False
+        while queue:
+            left = queue.popleft()
+            for right in adjacency[left]:
+                partner = match_right.get(right)
+                if partner is None:
+                    found = True
+                elif partner not in distance:
+                    distance[partner] = distance[left] + 1
+                    queue.append(partner)
+        return found, distance
+
+    def dfs(left, distance):
+        # Iterative DFS along the BFS layers to avoid deep recursion
+        stack = [(left, iter(adjacency[left]))]
+        path = []
+        while stack:
+            node, neighbours = stack[-1]
+            advanced = False
+            for right in neighbours:
+                partner = match_right.get(right)
+                if partner is None:
+                    path.append((node, right))
+                    for matched_left, matched_right in path:
+                        match_left[matched_left] = matched_right
+                        match_right[matched_right] = matched_left
+                    return True
+                if distance.get(partner, infinity) == distance[node] + 1:
+                    path.append((node, right))
+                    stack.append((partner, iter(adjacency[partner])))
+                    advanced = True
+                    break
+            if not advanced:
+                distance[node] = infinity
+                stack.pop()
+                if path:
+                    path.pop()
+        return False
+
+    while True:
+        found, distance = bfs()
+        if not found:
+            break
+        for left in adjacency:
+            if match_left.get(left) is None:
+                dfs(left, distance)
+
+
+def _earliest_start(candidate_free, interviewer_free, duration):
+    """Earliest start on the 5-minute grid where both are free for ``duration``"""
+    step = timedelta(minutes=SLOT_INCREMENT_MINUTES)
+    for interval in interviewer_free.intervals:
+        start = interval["start"]
+        while start + duration <= interval["end"]:
+            if candidate_free.contains(start, start + duration):
+                return start
+            start += step
+    return None
+
+
+def assign_slots(candidates, interviewer_free, objective="pack"):
+    """Assign one interview slot per candidate without double-booking any interviewer.
+
+    ``candidates`` maps a candidate key to ``{"duration_minutes": int, "free": [intervals]}``
+    where ``free`` is the candidate's availability inside their allowed window.
+    ``interviewer_free`` maps each interviewer to their free intervals.
+
+    Returns ``(assignments, unassigned_keys)``.
+    """
+    interviewers = {name: _IntervalSet(free) for name, free in interviewer_free.items()}
+    load = defaultdict(int)
+    assignments = []
+    unassigned = []
+
+    groups = defaultdict(list)
+    for key, candidate in candidates.items():
+        groups[int(candidate["duration_minutes"])].append(key)
+
+    for minutes in sorted(groups, reverse=True):
+        duration = timedelta(minutes=minutes)
+        keys = groups[minutes]
+        candidate_free = {key: _IntervalSet(candidates[key]["free"]) for key in keys}
+
+        blocks = [
+            (start, end, name)
+            for name, free in interviewers.items()
+            for start, end in _tile(free, duration)
+        ]
+        adjacency = {
+            key: [index for index, (start, end, _) in enumerate(blocks) if candidate_free[key].contains(start, end)]
+            for key in keys
+        }
+
+        # Greedy seed: most constrained candidates first, preferred block by objective
+        match_left, match_right = {}, {}
+        seed_load = defaultdict(int, load)
+        for key in sorted(keys, key=lambda key: len(adjacency[key])):
+            options = [index for index in adjacency[key] if index not in match_right]
+            if not options:
+                continue
+            if objective == "spread":
+                best = min(options, key=lambda index: (seed_load[blocks[index][2]], blocks[index][0]))
+            else:
+                best = min(options, key=lambda index: blocks[index][0])
+            match_left[key], match_right[best] = best, key
+            seed_load[blocks[best][2]] += 1
+
+        _hopcroft_karp(adjacency, match_left, match_right)
+
+        for key in keys:
+            index = match_left.get(key)
+            if index is None:
+                continue
+            start, end, name = blocks[index]
+            interviewers[name].remove(start, end)
+            load[name] += 1
+            assignments.append(Assignment(key, name, start, end))
+
+        # Whoever didn't line up with a block gets the earliest remaining grid start
+        for key in keys:
+            if match_left.get(key) is not None:
+                continue
+            order = sorted(interviewers, key=lambda name: load[name]) if objective == "spread" else interviewers
+            for name in order:
+                start = _earliest_start(candidate_free[key], interviewers[name], duration)
+                if start is not None:
+                    interviewers[name].remove(start, start + duration)
+                    load[name] += 1
+                    assignments.append(Assignment(key, name, start, start + duration))
+                    break
+            else:
+                unassigned.append(key)
+
+    assignments.sort(key=lambda assignment: assignment.start)
+    return assignments, unassigned
@@ -0,0 +1,348 @@
+"""Availability engine: turns busy intervals from any number of calendars into interview slots.
+
+Busy intervals are merged per attendee and then combined in a single k-way
+sweep (``heapq.merge`` over the attendees' sorted boundaries), which costs
+O(total intervals · log k) however many interviewers are on the panel.
+
+``compute_availability`` can also use the NumPy occupancy engine in
+occupancy.py with ``SCHEDULAI_SLOT_ENGINE=bitmap``. It returns the same slots
+but is no faster for chat-sized searches, so the sweep is the default.
+"""
+import heapq
+import os
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timezone, timedelta
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Slot start times are generated on a 5-minute grid inside each free block
+SLOT_INCREMENT_MINUTES = 5
+
+SLOT_ENGINE = os.environ.get("SCHEDULAI_SLOT_ENGINE", "sweep")
+
+
+class SlotList(Sequence):
+    """Interview slots stored as start-minute offsets, materialized as dicts only when read.
+
+    Offsets are packed into a 4-byte ``array``, so a day of 5-minute slots
+    costs a few hundred bytes instead of a dict and two datetimes per slot.
+    """
+
+    def __init__(self, base, start_offsets, duration_minutes):
+        self.base = base
+        self.start_offsets = array("i", (int(offset) for offset in start_offsets))
+        self.duration_minutes = duration_minutes
+
+    @classmethod
+    def from_slots(cls, base, slots, duration_minutes):
+        """Pack ``{"start", "end"}`` slots; returns them as a plain list if a start is off the minute grid"""
+        slots = list(slots)
+        offsets = []
+        for slot in slots:
+            minutes, seconds = divmod((slot["start"] - base).total_seconds(), 60)
+            if seconds:
+                return slots
+            offsets.append(minutes)
+        return cls(base, offsets, duration_minutes)
+
+    def _slot(self, offset):
+        start = self.base + timedelta(minutes=int(offset))
+        return {"start": start, "end": start + timedelta(minutes=self.duration_minutes)}
+
+    def __len__(self):
+        return len(self.start_offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._slot(offset) for offset in self.start_offsets[index]]
+        return self._slot(self.start_offsets[index])
+
+    def __iter__(self):
+        for offset in self.start_offsets:
+            yield self._slot(offset)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"SlotList({len(self)} slots of {self.duration_minutes} min from {self.base.isoformat()})"
+
+
+def convert_utc_to_ist(utc_dt):
+    """Convert UTC datetime to IST timezone"""
+    if not isinstance(utc_dt, datetime):
+        print(f"❌ convert_utc_to_ist() received non-datetime object: {utc_dt}")
+        return utc_dt
+    return utc_dt.astimezone(IST)
+
+
+def parse_api_datetime(value):
+    """Parse an RFC 3339 timestamp from the Calendar API into an IST datetime"""
+    return convert_utc_to_ist(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def day_window(date, working_hours=None):
+    """IST start and end of the search window for ``date``"""
+    if working_hours:
+        start_hour, end_hour = working_hours
+        start = datetime.combine(date, datetime.min.time()).replace(hour=start_hour, tzinfo=IST)
+        end = datetime.combine(date, datetime.min.time()).replace(hour=end_hour, tzinfo=IST)
+    else:
+        start = datetime.combine(date, datetime.min.time()).replace(tzinfo=IST)
+        end = datetime.combine(date, datetime.max.time()).replace(tzinfo=IST)
+    return start, end
+
+
+def merge_busy_intervals(busy_slots, window_start=None, window_end=None):
+    """Sort, clip to the window and merge overlapping or touching busy slots"""
+    merged = []
+    for slot in sorted(busy_slots, key=lambda x: x["start"]):
+        start, end = slot["start"], slot["end"]
+        if window_start is not None:
+            start = max(start, window_start)
+        if window_end is not None:
+            end = min(end, window_end)
+        if start >= end:
+            continue
+        if not merged or merged[-1]["end"] < start:
+            merged.append({"start": start, "end": end})
+        else:
+            merged[-1]["end"] = max(merged[-1]["end"], end)
+    return merged
+
+
+def get_user_free_slots(busy_slots, start_of_day, end_of_day):
+    """Calculate free slots by subtracting busy slots from the full day window."""
+    free_slots = []
+    current_start = start_of_day
+
+    for slot in sorted(busy_slots, key=lambda x: x["start"]):
+        if current_start < slot["start"]:
+            free_slots.append({"start": current_start, "end": slot["start"]})
+        current_start = max(current_start, slot["end"])
+
+    if current_start < end_of_day:
+        free_slots.append({"start": current_start, "end": end_of_day})
+
+    return free_slots
+
+
+def _boundaries(busy_slots, group):
+    """Yield (time, delta, group) for merged busy slots, already in time order"""
+    for slot in busy_slots:
+        yield slot["start"], 1, group
+        yield slot["end"], -1, group
+
+
+def find_common_free_intervals(busy_by_attendee, window_start, window_end,
+                               required=None, optional=None, quorum=0):
+    """Maximal intervals in the window where every required attendee is free.
+
+    ``optional`` attendees never block a slot on their own; when ``quorum`` is
+    set, at least that many of them must also be free ("N of M interviewers").
+    Attendees default to required unless listed as optional.
+    """
+    optional = set(optional or ())
+    if required is None:
+        required = [attendee for attendee in busy_by_attendee if attendee not in optional]
+    if quorum > len(optional):
+        return []
+
+    streams = []
+    for attendee in list(required) + sorted(optional):
+        group = "optional" if attendee in optional else "required"
+        busy = merge_busy_intervals(busy_by_attendee.get(attendee, []), window_start, window_end)
+        streams.append(_boundaries(busy, group))
+
+    busy_counts = {"required": 0, "optional": 0}
+    max_optional_busy = len(optional) - quorum
+
+    def is_free():
+        return busy_counts["required"] == 0 and busy_counts["optional"] <= max_optional_busy
+
+    free_intervals = []
+    free_since = window_start if is_free() else None
+    events = heapq.merge(*streams, key=lambda event: event[0])
+
+    for time, delta, group in events:
+        busy_counts[group] += delta
+        if free_since is not None and not is_free():
+            if free_since < time:
+                free_intervals.append({"start": free_since, "end": time})
+            free_since = None
+        elif free_since is None and is_free():
+            free_since = time
+
+    if free_since is not None and free_since < window_end:
+        free_intervals.append({"start": free_since, "end": window_end})
+
+    # Boundaries at the same instant can open and close zero-length gaps; merge them away
+    return merge_busy_intervals(free_intervals)
+
+
+def split_slot_by_duration(slot_start, slot_end, duration_minutes):
+    """Split a time slot into smaller slots of given duration using 5-minute increments"""
+    slots = []
+    increment_minutes = SLOT_INCREMENT_MINUTES
+
+    # Calculate total duration of the free block in minutes
+    total_duration = int((slot_end - slot_start).total_seconds() / 60)
+
+    # Calculate how many complete duration_minutes slots could fit with 5-min increments
+    possible_start_times = range(0, total_duration - duration_minutes + 1, increment_minutes)
+
+    # Generate all possible slots
+    for offset in possible_start_times:
+        start_time = slot_start + timedelta(minutes=offset)
+        end_time = start_time + timedelta(minutes=duration_minutes)
+
+        # Only add slot if it fits completely within the free time block
+        if end_time <= slot_end:
+            slots.append({
+                "start": start_time,
+                "end": end_time
+            })
+
+    return slots
+
+
+def filter_slots_by_working_hours(slots, start_hour, end_hour):
+    """Filter slots to only include those within working hours"""
+    filtered_slots = []
+    for slot in slots:
+        slot_start_hour = slot['start'].hour
+        slot_end_hour = slot['end'].hour
+
+        # Only include slots that fall within working hours
+        if start_hour <= slot_start_hour and slot_end_hour <= end_hour:
+            filtered_slots.append(slot)
+
+    return filtered_slots
+
+
+def compute_availability(busy_by_attendee, window_start, window_end, duration_minutes,
+                         working_hours=None, required=None, optional=None, quorum=0, engine=None):
+    """Common free blocks and bookable interview slots for the given attendees"""
+    if (engine or SLOT_ENGINE) == "bitmap":
+        from occupancy import compute_availability_bitmap
+
+        result = compute_availability_bitmap(
+            busy_by_attendee, window_start, window_end, duration_minutes,
+            working_hours=working_hours, required=required, optional=optional, quorum=quorum,
+        )
+        if result is not None:
+            return result
+
+    common_free_slots = find_common_free_intervals(
+        busy_by_attendee, window_start, window_end,
+        required=required, optional=optional, quorum=quorum,
+    )
+
+    split_slots = []
+    for slot in common_free_slots:
+        split_slots.extend(split_slot_by_duration(slot["start"], slot["end"], duration_minutes))
+
+    if working_hours:
+        split_slots = filter_slots_by_working_hours(split_slots, *working_hours)
+
+    return {
+        "common_free_slots": common_free_slots,
+        "split_slots": SlotList.from_slots(window_start, split_slots, duration_minutes)
+    }
+
+
+def busy_from_freebusy(calendars, window_start=None, window_end=None):
+    """Convert a freebusy ``calendars`` mapping into IST busy lists.
+
+    Returns ``(busy_by_attendee, inaccessible)``. Calendars the service account
+    cannot read are reported as inaccessible and treated as busy for the whole
+    window, so they can never appear free.
+    """
+    busy_by_attendee = {}
+    inaccessible = []
+    for attendee, calendar in calendars.items():
+        if "errors" in calendar:
+            inaccessible.append(attendee)
+            if window_start is not None and window_end is not None:
+                busy_by_attendee[attendee] = [{"start": window_start, "end": window_end}]
+            continue
+        busy_by_attendee[attendee] = [
+            {"start": parse_api_datetime(slot["start"]), "end": parse_api_datetime(slot["end"])}
+            for slot in calendar.get("busy", [])
+        ]
+    return busy_by_attendee, inaccessible
+
+
+def day_windows(start_date, end_date, working_hours=None, skip_weekends=True):
+    """Per-day IST search windows for every (working) day in an inclusive date range"""
+    windows = []
+    current = start_date
+    while current <= end_date:
+        if not (skip_weekends and current.weekday() >= 5):
+            windows.append(day_window(current, working_hours))
+        current += timedelta(days=1)
+    return windows
+
+
+def _fragmentation_score(slot, common_free_slots):
+    """0 when a slot hugs the start or end of its free block, 1 when it splits one in two"""
+    for block in common_free_slots:
+        if block["start"] <= slot["start"] and slot["end"] <= block["end"]:
+            return 0 if slot["start"] == block["start"] or slot["end"] == block["end"] else 1
+    return 1
+
+
+def _spaced(ranked_slots):
+    """Keep slots in rank order, skipping any that overlap one already kept"""
+    kept = []
+    for slot in ranked_slots:
+        if all(slot["end"] <= other["start"] or other["end"] <= slot["start"] for other in kept):
+            kept.append(slot)
+    return kept
+
+
+def _interleave(per_day, limit):
+    """Every day's first pick, then every day's second, ... up to ``limit``; returned in time order"""
+    picked = [slots[rank] for rank in range(max(map(len, per_day), default=0))
+              for slots in per_day if rank < len(slots)]
+    picked = picked[:limit] if limit else picked
+    picked.sort(key=lambda slot: slot["start"])
+    return picked
+
+
+def compute_range_availability(busy_by_attendee, windows, duration_minutes, working_hours=None,
+                               required=None, optional=None, quorum=0, limit=None, order="earliest"):
+    """Availability across several day windows from one set of busy intervals.
+
+    Each day offers non-overlapping slots, and ``limit`` is shared out across
+    the days in turn so a week-long search isn't filled by one morning.
+    ``order="earliest"`` picks each day's earliest slots; ``order="best"``
+    prefers slots that don't split a free block in two.
+    """
+    common_free_slots = []
+    day_slots = []
+    for window_start, window_end in windows:
+        result = compute_availability(
+            busy_by_attendee, window_start, window_end, duration_minutes,
+            working_hours=working_hours, required=required, optional=optional, quorum=quorum,
+        )
+        common_free_slots.extend(result["common_free_slots"])
+        day_slots.append((result["split_slots"], result["common_free_slots"]))
+
+    if order == "best":
+        # Score each slot against its own day's free blocks only
+        per_day = [
+            _spaced(sorted(slots, key=lambda slot: (_fragmentation_score(slot, blocks), slot["start"])))
+            for slots, blocks in day_slots
+        ]
+    else:
+        per_day = [_spaced(slots) for slots, _ in day_slots]
+    split_slots = _interleave(per_day, limit)
+
+    return {
+        "common_free_slots": common_free_slots,
+        "split_slots": SlotList.from_slots(windows[0][0], split_slots, duration_minutes) if windows else []
+    }
@@ -0,0 +1,184 @@
+"""Bulk scheduling: many candidates for one recruiter from a CSV.
+
+Expected columns (case-insensitive):
+
+    candidate_email, duration, start_date, end_date
+
+``duration`` accepts the same phrases as the chat ("45 min", "1 hr 30 min").
+``start_date``/``end_date`` are optional and default to the next few working
+days; a single ``date`` column may be used instead of the pair.
+
+Availability for every row comes from one batched freebusy pass over the
+union of all date windows, and rows are given non-overlapping slots by the
+assignment solver.
+"""
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from assignment import assign_slots
+from availability import busy_from_freebusy, day_window, day_windows, find_common_free_intervals
+from calendar_events import build_interview_event
+from event_writer import EventWriter
+from freebusy_cache import cached_freebusy_query
+from parsers import EMAIL_PATTERN, extract_duration
+from prefetch import PREFETCH_DAYS, next_working_days
+
+FREEBUSY_MAX_ITEMS = 50  # Calendars per freebusy request accepted by the API
+
+RESULT_COLUMNS = [
+    "candidate_email", "duration_minutes", "start_date", "end_date",
+    "slot_start", "slot_end", "status", "event_link",
+]
+
+
+def _parse_date(value):
+    if value is None or pd.isna(value) or str(value).strip() == "":
+        return None
+    parsed = pd.to_datetime(str(value).strip(), errors="coerce", dayfirst=False)
+    return None if pd.isna(parsed) else parsed.date()
+
+
+def load_bulk_requests(source, today=None):
+    """Read and validate a bulk CSV into a results table with a per-row status"""
+    raw = pd.read_csv(source, dtype=str, keep_default_na=False)
+    raw.columns = [str(column).strip().lower() for column in raw.columns]
+    if "candidate_email" not in raw.columns:
+        raise ValueError("The CSV needs a 'candidate_email' column.")
+
+    default_days = next_working_days(PREFETCH_DAYS, today)
+    rows = []
+    for record in raw.to_dict("records"):
+        emails = EMAIL_PATTERN.findall(record.get("candidate_email", "").lower())
+        duration = extract_duration(record.get("duration", "")) if record.get("duration") else None
+        start = _parse_date(record.get("start_date") or record.get("date"))
+        end = _parse_date(record.get("end_date") or record.get("date"))
+        start = start or default_days[0]
+        end = end or (start if record.get("start_date") or record.get("date") else default_days[-1])
+
+        status = "pending"
+        if not emails:
+            status = "invalid email"
+        elif not duration:
+            status = "invalid duration"
+        elif end < start:
+            status = "invalid date range"
+        elif end < (today or date.today()):
+            status = "date in the past"
+
+        rows.append({
+            "candidate_email": emails[0] if emails else record.get("candidate_email", ""),
+            "duration_minutes": duration,
+            "start_date": max(start, today or date.today()),
+            "end_date": end,
+            "slot_start": None,
+            "slot_end": None,
+            "status": status,
+            "event_link": "",
+        })
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def fetch_bulk_busy(service, users, window_start, window_end):
+    """Busy slots for all users over one window, in as few freebusy requests as the API allows"""
+    busy_by_attendee, inaccessible = {}, []
+    users = list(dict.fromkeys(users))
+    for offset in range(0, len(users), FREEBUSY_MAX_ITEMS):
+        body = {
+            "timeMin": window_start.astimezone(timezone.utc).isoformat(),
+            "timeMax": window_end.astimezone(timezone.utc).isoformat(),
+            "items": [{"id": email} for email in users[offset:offset + FREEBUSY_MAX_ITEMS]],
+        }
+        calendars = cached_freebusy_query(service, body).get("calendars", {})
+        busy, unreadable = busy_from_freebusy(calendars, window_start, window_end)
+        busy_by_attendee.update(busy)
+        inaccessible.extend(unreadable)
+    return busy_by_attendee, inaccessible
+
+
+def _free_in_windows(busy, windows):
+    """Free intervals inside the given day windows for one attendee's busy slots"""
+    free = []
+    for window_start, window_end in windows:
+        free.extend(find_common_free_intervals({"attendee": busy}, window_start, window_end))
+    return free
+
+
+def plan_bulk_schedule(service, requests, recruiter_email, working_hours=None, objective="pack"):
+    """Assign non-overlapping slots to every pending row in one pass.
+
+    All rows are solved together (see assignment.py), so early rows can't
+    fragment the recruiter's calendar and starve later ones. ``objective`` is
+    "pack" to keep interviews back to back.
+    """
+    plan = requests.copy()
+    pending = plan.index[plan["status"] == "pending"]
+    if len(pending) == 0:
+        return plan
+
+    first_day = plan.loc[pending, "start_date"].min()
+    last_day = plan.loc[pending, "end_date"].max()
+    window_start = day_window(first_day, working_hours)[0]
+    window_end = day_window(last_day, working_hours)[1]
+    users = [recruiter_email] + plan.loc[pending, "candidate_email"].tolist()
+    busy_by_attendee, inaccessible = fetch_bulk_busy(service, users, window_start, window_end)
+
+    if recruiter_email in inaccessible:
+        plan.loc[pending, "status"] = "recruiter calendar not accessible"
+        return plan
+
+    recruiter_free = _free_in_windows(
+        busy_by_attendee.get(recruiter_email, []), day_windows(first_day, last_day, working_hours)
+    )
+    candidates = {}
+    for index in pending:
+        row = plan.loc[index]
+        if row["candidate_email"] in inaccessible:
+            plan.at[index, "status"] = "candidate calendar not accessible"
+            continue
+        windows = day_windows(row["start_date"], row["end_date"], working_hours)
+        candidates[index] = {
+            "duration_minutes": int(row["duration_minutes"]),
+            "free": _free_in_windows(busy_by_attendee.get(row["candidate_email"], []), windows),
+        }
+
+    assignments, unassigned = assign_slots(candidates, {recruiter_email: recruiter_free}, objective=objective)
+    for assignment in assignments:
+        plan.at[assignment.candidate, "slot_start"] = assignment.start
+        plan.at[assignment.candidate, "slot_end"] = assignment.end
+        plan.at[assignment.candidate, "status"] = "planned"
+    for index in unassigned:
+        plan.at[index, "status"] = "no common free slot"
+    return plan
+
+
+def schedule_bulk(service, plan, recruiter_email, http=None):
+    """Insert an event for every planned row through batch requests and record the outcome per row"""
+    results = plan.copy()
+    planned = results.index[results["status"] == "planned"]
+    writer = EventWriter(service, http=http)
+    for index in planned:
+        row = results.loc[index]
+        slot = {"start": row["slot_start"], "end": row["slot_end"]}
+        event = build_interview_event(recruiter_email, row["candidate_email"], slot, int(row["duration_minutes"]))
+        writer.insert(recruiter_email, event, key=str(index))
+
+    write_results = writer.execute()
+    for index in planned:
+        result = write_results[str(index)]
+        if result.ok:
+            results.at[index, "status"] = "scheduled"
+            results.at[index, "event_link"] = (result.response or {}).get("htmlLink", "")
+        else:
+            results.at[index, "status"] = f"failed: {result.error}"
+    return results
+
+
+def format_results(results):
+    """Results table with readable IST slot times for display or download"""
+    table = results.copy()
+    for column in ("slot_start", "slot_end"):
+        table[column] = table[column].map(
+            lambda value: value.strftime("%Y-%m-%d %H:%M") if isinstance(value, datetime) else ""
+        )
+    return table
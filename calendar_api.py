@@ -0,0 +1,210 @@
+"""Rate limiting, retries and error classification for Google Calendar calls.
+
+Every Calendar request the bot sends goes through ``execute``. Requests first
+take a token from a process-wide bucket for the Cloud project and one per
+calendar they touch, so many Streamlit sessions queue briefly instead of
+bursting into the API quota together. Rate-limit and transient server errors
+are retried with exponential backoff and jitter (honouring ``Retry-After``);
+anything else is raised as a ``CalendarAPIError`` whose ``kind`` separates
+quota problems from sharing/permission problems.
+"""
+import os
+import random
+import threading
+import time
+
+API_RATE = float(os.environ.get("SCHEDULAI_API_RATE", "10"))  # Requests per second for the project
+API_BURST = int(os.environ.get("SCHEDULAI_API_BURST", "20"))
+CALENDAR_RATE = float(os.environ.get("SCHEDULAI_CALENDAR_RATE", "5"))  # Requests per second per calendar
+CALENDAR_BURST = int(os.environ.get("SCHEDULAI_CALENDAR_BURST", "10"))
+# Per-calendar buckets back at capacity and unused this long are dropped
+CALENDAR_BUCKET_TTL = float(os.environ.get("SCHEDULAI_CALENDAR_BUCKET_TTL", "600"))
+MAX_WAIT_SECONDS = float(os.environ.get("SCHEDULAI_API_MAX_WAIT", "30"))
+MAX_RETRIES = int(os.environ.get("SCHEDULAI_API_MAX_RETRIES", "4"))
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 32.0
+
+TRANSIENT_STATUSES = {500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded", "usageLimits"}
+
+
+class CalendarAPIError(Exception):
+    """A Calendar call that failed for good.
+
+    ``kind`` is one of "rate_limit", "quota", "permission", "not_found",
+    "transient" or "other".
+    """
+
+    def __init__(self, kind, message, status=None):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+
+
+# 📌 Error classification
+def error_status(error):
+    """HTTP status of a googleapiclient ``HttpError``, or None for anything else"""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return int(status) if status is not None else None
+
+
+def _reasons(error):
+    details = getattr(error, "error_details", None) or []
+    return {detail.get("reason") for detail in details if isinstance(detail, dict)}
+
+
+def classify_error(error):
+    """Kind of failure behind a googleapiclient ``HttpError`` (see ``CalendarAPIError``)"""
+    if isinstance(error, CalendarAPIError):
+        return error.kind
+    status = error_status(error)
+    reasons = _reasons(error)
+    text = str(error)
+    if status == 429 or reasons & RATE_LIMIT_REASONS or any(reason in text for reason in RATE_LIMIT_REASONS):
+        return "rate_limit"
+    if status == 403 and (reasons & QUOTA_REASONS or any(reason in text for reason in QUOTA_REASONS)):
+        return "quota"
+    if status in (401, 403):
+        return "permission"
+    if status in (404, 410):
+        return "not_found"
+    if status in TRANSIENT_STATUSES:
+        return "transient"
+    return "other"
+
+
+def is_retryable(error):
+    """True for rate limits and transient server errors, including the limiter turning a request away"""
+    if isinstance(error, CalendarAPIError):
+        return error.kind == "rate_limit"
+    return error_status(error) is not None and classify_error(error) in ("rate_limit", "transient")
+
+
+def _retry_after(error):
+    headers = getattr(error, "resp", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def backoff_delay(attempt, base=BACKOFF_SECONDS, cap=MAX_BACKOFF_SECONDS):
+    """Exponential backoff with jitter for the given retry (1-based)"""
+    return min(cap, base * (2 ** (attempt - 1)) * (1 + random.random()))
+
+
+# 📌 Token buckets
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take ``tokens`` now, going into debt if needed; returns how long to wait before using them"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, tokens=1):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def is_idle(self, now, seconds):
+        """True if unused for ``seconds`` and refilled to capacity, i.e. a fresh bucket would behave the same"""
+        with self._lock:
+            elapsed = now - self._updated
+            return elapsed >= seconds and self._tokens + elapsed * self.rate >= self.capacity
+
+
+class RateLimiter:
+    """One bucket for the whole project plus one per calendar id, shared by every session"""
+
+    def __init__(self, rate=API_RATE, burst=API_BURST, calendar_rate=CALENDAR_RATE,
+                 calendar_burst=CALENDAR_BURST, max_wait=MAX_WAIT_SECONDS,
+                 bucket_ttl=CALENDAR_BUCKET_TTL, clock=time.monotonic, sleep=time.sleep):
+        self.project = TokenBucket(rate, burst, clock)
+        self.calendar_rate = calendar_rate
+        self.calendar_burst = calendar_burst
+        self.max_wait = max_wait
+        self.bucket_ttl = bucket_ttl
+        self._clock = clock
+        self._sleep = sleep
+        self._calendars = {}
+        self._next_sweep = clock() + bucket_ttl
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.rejected = 0
+        self.evicted = 0
+
+    def _evict_idle(self, now):
+        # At most one sweep per TTL keeps lookups O(1) on average however many calendars were seen
+        idle = [calendar_id for calendar_id, bucket in self._calendars.items() if bucket.is_idle(now, self.bucket_ttl)]
+        for calendar_id in idle:
+            del self._calendars[calendar_id]
+        self.evicted += len(idle)
+        self._next_sweep = now + self.bucket_ttl
+
+    def _calendar_bucket(self, calendar_id):
+        with self._lock:
+            now = self._clock()
+            if now >= self._next_sweep:
+                self._evict_idle(now)
+            if calendar_id not in self._calendars:
+                self._calendars[calendar_id] = TokenBucket(self.calendar_rate, self.calendar_burst, self._clock)
+            return self._calendars[calendar_id]
+
+    def acquire(self, calendar_ids=(), tokens=1):
+        """Wait for room in the project bucket and each calendar's bucket.
+
+        Raises ``CalendarAPIError("rate_limit")`` instead of waiting longer than ``max_wait``.
+        """
+        buckets = [(self.project, tokens)] + [(self._calendar_bucket(calendar_id), 1) for calendar_id in set(calendar_ids)]
+        waits = [bucket.reserve(cost) for bucket, cost in buckets]
+        wait = max(waits)
+        if wait > self.max_wait:
+            for bucket, cost in buckets:
+                bucket.refund(cost)
+            with self._lock:
+                self.rejected += 1
+            raise CalendarAPIError("rate_limit", "Too many Calendar requests right now; please try again shortly.", 429)
+        if wait > 0:
+            with self._lock:
+                self.waited_seconds += wait
+            self._sleep(wait)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calendars": len(self._calendars),
+                "evicted": self.evicted,
+                "waited_seconds": self.waited_seconds,
+                "rejected": self.rejected,
+            }
+
+
+rate_limiter = RateLimiter()
+
+
+def execute(request, calendar_ids=(), limiter=None, max_retries=MAX_RETRIES, sleep=time.sleep):
+    """Rate-limited ``request.execute()`` with retries; raises ``CalendarAPIError`` on failure"""
+    limiter = limiter or rate_limiter
+    for attempt in range(max_retries + 1):
+        limiter.acquire(calendar_ids)
+        try:
+            return request.execute()
+        except Exception as error:
+            if error_status(error) is None:
+                raise
+            if not is_retryable(error) or attempt == max_retries:
+                raise CalendarAPIError(classify_error(error), str(error), error_status(error)) from error
+            sleep(_retry_after(error) or backoff_delay(attempt + 1))
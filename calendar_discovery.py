@@ -0,0 +1,132 @@
+"""Offline Calendar discovery document handling.
+
+``build("calendar", "v3")`` locates and parses the discovery document every
+time a process starts. Here the document is kept in an on-disk cache, seeded
+from the copy bundled with google-api-python-client, so the service can be
+built with no network round trip. Refreshing from Google is an explicit step:
+
+    python calendar_discovery.py --refresh
+    python calendar_discovery.py --benchmark
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest"
+DISCOVERY_CACHE_FILE = os.environ.get(
+    "SCHEDULAI_DISCOVERY_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "calendar.v3.json"),
+)
+
+# Parsed documents by cache file path, kept for the lifetime of the process
+_documents = {}
+_last_build_seconds = None
+
+
+def _write_atomically(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _bundled_document():
+    """Discovery document shipped inside google-api-python-client (no network)."""
+    from googleapiclient.discovery_cache import get_static_doc
+
+    content = get_static_doc("calendar", "v3")
+    if content is None:
+        raise FileNotFoundError("google-api-python-client has no bundled calendar v3 discovery document")
+    return content
+
+
+def load_discovery_document(path=DISCOVERY_CACHE_FILE):
+    """Return the parsed discovery document, seeding the on-disk cache if needed."""
+    path = os.path.abspath(path)
+    if path in _documents:
+        return _documents[path]
+
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+    else:
+        content = _bundled_document()
+        try:
+            _write_atomically(path, content)
+        except OSError as e:
+            print(f"⚠️ Could not write discovery cache {path}: {e}")
+
+    _documents[path] = json.loads(content)
+    return _documents[path]
+
+
+def refresh_discovery_document(path=DISCOVERY_CACHE_FILE, http=None):
+    """Download the current discovery document and replace the on-disk cache."""
+    import httplib2
+
+    http = http or httplib2.Http(timeout=30)
+    response, content = http.request(DISCOVERY_URL)
+    if response.status != 200:
+        raise RuntimeError(f"Discovery request failed with HTTP {response.status}")
+
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    document = json.loads(content)  # Refuse to cache anything that doesn't parse
+    _write_atomically(path, content)
+    _documents[os.path.abspath(path)] = document
+    return document
+
+
+def build_calendar_service(credentials=None, http=None, path=DISCOVERY_CACHE_FILE, client_options=None):
+    """Build the Calendar v3 client from the cached discovery document."""
+    global _last_build_seconds
+    from googleapiclient.discovery import build_from_document
+
+    started = time.perf_counter()
+    service = build_from_document(
+        load_discovery_document(path), credentials=credentials, http=http, client_options=client_options
+    )
+    _last_build_seconds = time.perf_counter() - started
+    return service
+
+
+def last_build_seconds():
+    """Time taken by the most recent ``build_calendar_service`` call."""
+    return _last_build_seconds
+
+
+def measure_cold_start(path=DISCOVERY_CACHE_FILE):
+    """Time loading the cached document and building a client, as a fresh process would."""
+    import httplib2
+
+    _documents.pop(os.path.abspath(path), None)
+    started = time.perf_counter()
+    load_discovery_document(path)
+    loaded = time.perf_counter()
+    build_calendar_service(http=httplib2.Http(), path=path)  # Unauthenticated, nothing is sent
+    built = time.perf_counter()
+    return {"load_seconds": loaded - started, "build_seconds": built - loaded, "total_seconds": built - started}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the cached Calendar discovery document")
+    parser.add_argument("--refresh", action="store_true", help="download the latest document from Google")
+    parser.add_argument("--benchmark", action="store_true", help="measure cold-start build time from the cache")
+    args = parser.parse_args()
+
+    if args.refresh:
+        refresh_discovery_document()
+        print(f"✅ Refreshed {DISCOVERY_CACHE_FILE}")
+    if args.benchmark or not args.refresh:
+        result = measure_cold_start()
+        print(
+            f"⏱️ Cold start: load {result['load_seconds'] * 1000:.1f} ms, "
+            f"build {result['build_seconds'] * 1000:.1f} ms, total {result['total_seconds'] * 1000:.1f} ms"
+        )
@@ -0,0 +1,82 @@
+"""Interview event bodies, sharing links and inserts shared by the chat flow and bulk mode."""
+from datetime import timezone
+
+from calendar_api import CalendarAPIError, execute
+from calendar_sync import calendar_sync
+from freebusy_cache import freebusy_cache
+
+
+def build_interview_event(recruiter_email, candidate_email, slot, duration_minutes, event_id=None):
+    """Calendar API body for an interview in the given slot.
+
+    ``event_id`` (lowercase base32hex, e.g. ``uuid4().hex``) makes inserting it idempotent.
+    """
+    # Ensure datetimes are in UTC for Google Calendar API
+    start_utc = slot["start"].astimezone(timezone.utc)
+    end_utc = slot["end"].astimezone(timezone.utc)
+
+    # Create calendar event without attendees first
+    event = {
+        "summary": "Interview Meeting",
+        "description": f"""Interview scheduled by AI Interview Scheduler.
+
+                                            Recruiter: {recruiter_email}
+                                            Candidate: {candidate_email}
+                                            Duration: {duration_minutes} minutes""",
+        "start": {
+            "dateTime": start_utc.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "timeZone": "UTC"
+        },
+        "end": {
+            "dateTime": end_utc.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "timeZone": "UTC"
+        }
+    }
+    if event_id:
+        event["id"] = event_id
+    return event
+
+
+def build_sharing_link(candidate_email, slot):
+    """'Add to Google Calendar' link the candidate can open"""
+    start_time = slot["start"].astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    end_time = slot["end"].astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    # URL encode the parameters
+    event_title = "Interview+Meeting"
+    description = f"Interview+with+{candidate_email}"
+    return (
+        "https://calendar.google.com/calendar/render?"
+        f"action=TEMPLATE&"
+        f"text={event_title}&"
+        f"dates={start_time}/{end_time}&"
+        f"details={description}&"
+        "location=&"
+        "trp=false&"
+        "pli=1&"
+        "sf=true&"
+        "output=xml"
+    )
+
+
+def insert_interview_event(service, recruiter_email, event):
+    """Insert the event into the recruiter's calendar and drop their cached busy times.
+
+    If the body carries an ``id`` that is already taken, an earlier attempt
+    landed, so that event is returned instead of a second copy.
+    """
+    # Use the recruiter's email as the calendar ID
+    try:
+        event_result = execute(
+            service.events().insert(calendarId=recruiter_email, body=event, sendUpdates="none"),
+            calendar_ids=[recruiter_email]
+        )
+    except CalendarAPIError as error:
+        if error.status != 409 or "id" not in event:
+            raise
+        event_result = execute(
+            service.events().get(calendarId=recruiter_email, eventId=event["id"]), calendar_ids=[recruiter_email]
+        )
+    freebusy_cache.invalidate(recruiter_email)  # Cached busy times are now stale
+    calendar_sync.mark_stale(recruiter_email)
+    return event_result
@@ -0,0 +1,226 @@
+"""Incremental calendar sync into a local availability index.
+
+Recruiters who share their calendar with the service account (event details,
+not just free/busy) can be enrolled: their events are listed once, and from
+then on only the changes since the last ``nextSyncToken`` are fetched. Busy
+lookups for enrolled calendars are answered from a sorted in-memory interval
+index instead of a freebusy query; everyone else still goes through freebusy.
+
+Enabled with ``SCHEDULAI_CALENDAR_SYNC=1``. An index older than
+``SCHEDULAI_SYNC_MAX_AGE`` seconds is brought up to date (one small delta
+request) before it answers.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import resources
+from availability import IST, parse_api_datetime
+from calendar_api import CalendarAPIError, execute
+
+SYNC_ENABLED = os.environ.get("SCHEDULAI_CALENDAR_SYNC", "0") == "1"
+SYNC_MAX_AGE_SECONDS = float(os.environ.get("SCHEDULAI_SYNC_MAX_AGE", "30"))
+SYNC_PAGE_SIZE = 2500  # Largest page events().list accepts
+KEEP_PAST = timedelta(days=1)  # Events that ended longer ago than this are never needed again
+
+_sync_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="calendar-sync")
+
+
+def _event_time(value):
+    if "dateTime" in value:
+        return parse_api_datetime(value["dateTime"])
+    # All-day events: midnight in IST, like the rest of the scheduler
+    return datetime.fromisoformat(value["date"]).replace(tzinfo=IST)
+
+
+def _blocks_time(event):
+    """Whether an event makes its calendar busy, following freebusy's rules"""
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return False
+    for attendee in event.get("attendees", []):
+        if attendee.get("self") and attendee.get("responseStatus") == "declined":
+            return False
+    return "start" in event and "end" in event
+
+
+class CalendarIndex:
+    """One calendar's busy events, queryable by time window in O(log n + k)"""
+
+    def __init__(self):
+        self.sync_token = None
+        self.synced_at = None
+        self._events = {}  # event id -> (start, end)
+        self._starts = []
+        self._entries = []
+        self._longest = timedelta(0)
+        self._dirty = False
+
+    def apply(self, items):
+        """Add, update or remove events from a full listing or a delta"""
+        horizon = datetime.now(IST) - KEEP_PAST
+        for event in items:
+            self._events.pop(event["id"], None)
+            if not _blocks_time(event):
+                continue
+            start, end = _event_time(event["start"]), _event_time(event["end"])
+            if end > horizon:
+                self._events[event["id"]] = (start, end)
+        self._dirty = True
+
+    def _rebuild(self):
+        self._entries = sorted(self._events.values())
+        self._starts = [start for start, _ in self._entries]
+        self._longest = max((end - start for start, end in self._entries), default=timedelta(0))
+        self._dirty = False
+
+    def busy(self, window_start, window_end):
+        """Busy intervals overlapping the window, as ``{"start", "end"}`` dicts in IST"""
+        if self._dirty:
+            self._rebuild()
+        first = bisect_left(self._starts, window_start - self._longest)
+        last = bisect_right(self._starts, window_end)
+        return [
+            {"start": start, "end": end}
+            for start, end in self._entries[first:last]
+            if end > window_start and start < window_end
+        ]
+
+    def __len__(self):
+        return len(self._events)
+
+
+class CalendarSync:
+    """Keeps an index per enrolled calendar, synced through events().list syncTokens"""
+
+    def __init__(self, service_factory=resources.get_calendar_service, max_age=SYNC_MAX_AGE_SECONDS,
+                 clock=time.monotonic):
+        self._service_factory = service_factory
+        self.max_age = max_age
+        self._clock = clock
+        self._indexes = {}
+        self._locks = {}
+        self._unavailable = set()  # Calendars shared for free/busy only
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.full_syncs = 0
+        self.delta_syncs = 0
+
+    def _calendar_lock(self, calendar_id):
+        with self._lock:
+            return self._locks.setdefault(calendar_id, threading.Lock())
+
+    def _list(self, calendar_id, sync_token=None):
+        """Every page of an events listing; returns ``(items, next_sync_token)``"""
+        service = self._service_factory()
+        items, page_token = [], None
+        while True:
+            params = {"calendarId": calendar_id, "singleEvents": True, "maxResults": SYNC_PAGE_SIZE}
+            if sync_token:
+                params["syncToken"] = sync_token
+            if page_token:
+                params["pageToken"] = page_token
+            response = execute(service.events().list(**params), calendar_ids=[calendar_id])
+            items.extend(response.get("items", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items, response.get("nextSyncToken")
+
+    def _full_sync(self, calendar_id):
+        index = CalendarIndex()
+        items, index.sync_token = self._list(calendar_id)
+        index.apply(items)
+        index.synced_at = self._clock()
+        with self._lock:
+            self._indexes[calendar_id] = index
+            self.full_syncs += 1
+        return index
+
+    def enroll(self, calendar_id):
+        """Index a calendar; False if the service account can only see its free/busy"""
+        with self._calendar_lock(calendar_id):
+            if calendar_id in self._indexes:
+                return True
+            try:
+                self._full_sync(calendar_id)
+                return True
+            except CalendarAPIError as e:
+                if e.kind in ("permission", "not_found"):
+                    with self._lock:
+                        self._unavailable.add(calendar_id)
+                    return False
+                raise
+            finally:
+                with self._lock:
+                    self._pending.discard(calendar_id)
+
+    def enroll_async(self, calendar_id):
+        """Start enrolling in the background unless already indexed, pending or unavailable"""
+        with self._lock:
+            if calendar_id in self._indexes or calendar_id in self._unavailable or calendar_id in self._pending:
+                return None
+            self._pending.add(calendar_id)
+        return _sync_pool.submit(self.enroll, calendar_id)
+
+    def is_indexed(self, calendar_id):
+        with self._lock:
+            return calendar_id in self._indexes
+
+    def mark_stale(self, calendar_id):
+        """Force a delta sync before the next lookup (e.g. after the bot wrote an event)"""
+        with self._lock:
+            index = self._indexes.get(calendar_id)
+        if index is not None:
+            index.synced_at = None
+
+    def drop(self, calendar_id):
+        with self._lock:
+            self._indexes.pop(calendar_id, None)
+
+    def refresh(self, calendar_id):
+        """Apply the changes since the last sync; a full sync if Google expired the token"""
+        with self._calendar_lock(calendar_id):
+            index = self._indexes[calendar_id]
+            try:
+                items, sync_token = self._list(calendar_id, index.sync_token)
+            except CalendarAPIError as e:
+                if e.status == 410:
+                    return self._full_sync(calendar_id)
+                raise
+            index.apply(items)
+            index.sync_token = sync_token or index.sync_token
+            index.synced_at = self._clock()
+            with self._lock:
+                self.delta_syncs += 1
+            return index
+
+    def busy(self, calendar_id, window_start, window_end):
+        """Busy intervals from the index, or None if this calendar should go through freebusy"""
+        with self._lock:
+            index = self._indexes.get(calendar_id)
+        if index is None:
+            return None
+        if index.synced_at is None or self._clock() - index.synced_at > self.max_age:
+            try:
+                index = self.refresh(calendar_id)
+            except CalendarAPIError as e:
+                if e.kind in ("permission", "not_found"):
+                    self.drop(calendar_id)  # Sharing was revoked
+                return None
+        with self._calendar_lock(calendar_id):
+            return index.busy(window_start, window_end)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calendars": len(self._indexes),
+                "events": sum(len(index) for index in self._indexes.values()),
+                "full_syncs": self.full_syncs,
+                "delta_syncs": self.delta_syncs,
+                "unavailable": len(self._unavailable),
+            }
+
+
+calendar_sync = CalendarSync()
@@ -0,0 +1,83 @@
+"""Asynchronous confirm-and-schedule pipeline.
+
+Clicking "Confirm and Schedule" submits a ``ConfirmationJob`` and returns at
+once. The calendar insert and the Gemini invitation email run concurrently on
+two bounded worker pools, kept separate so a hanging LLM call can never hold
+up calendar inserts. The UI polls the job and shows each part as it finishes;
+the email falls back to the default template when it misses its latency
+budget (see email_templates.py).
+
+Workers never touch ``st.session_state``: everything they need is passed in.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import resources
+from calendar_events import build_interview_event, build_sharing_link, insert_interview_event
+from email_templates import start_email_draft
+
+CALENDAR_WORKERS = int(os.environ.get("SCHEDULAI_CALENDAR_WORKERS", "4"))
+
+_calendar_pool = ThreadPoolExecutor(max_workers=CALENDAR_WORKERS, thread_name_prefix="calendar-insert")
+
+
+class ConfirmationJob:
+    """One interview being inserted and announced in the background"""
+
+    def __init__(self, recruiter_email, candidate_email, slot, duration_minutes, event_id=None):
+        self.recruiter_email = recruiter_email
+        self.candidate_email = candidate_email
+        self.slot = slot
+        self.duration_minutes = duration_minutes
+        self.event_id = event_id  # Lets a resumed confirmation find the event instead of inserting it twice
+        self.sharing_link = build_sharing_link(candidate_email, slot)
+        self.event_details = {
+            "date": slot["start"].strftime('%A, %B %d, %Y'),
+            "time": f"{slot['start'].strftime('%H:%M')} to {slot['end'].strftime('%H:%M')} IST",
+            "duration": duration_minutes,
+            "recruiter": recruiter_email
+        }
+        self._insert_future = None
+        self.email_draft = None
+
+    def submit(self):
+        """Start the insert and the email concurrently; returns immediately"""
+        event = build_interview_event(
+            self.recruiter_email, self.candidate_email, self.slot, self.duration_minutes, self.event_id
+        )
+        self._insert_future = _calendar_pool.submit(
+            insert_interview_event, resources.get_calendar_service(), self.recruiter_email, event
+        )
+        self.email_draft = start_email_draft(self.event_details, self.sharing_link, self.candidate_email)
+        return self
+
+    # Calendar event
+    @property
+    def event_done(self):
+        return self._insert_future.done()
+
+    @property
+    def event_error(self):
+        return self._insert_future.exception() if self._insert_future.done() else None
+
+    @property
+    def event_result(self):
+        return self._insert_future.result() if self.event_done and self.event_error is None else None
+
+    # Invitation email
+    @property
+    def email_timed_out(self):
+        return bool(self.email_draft.fell_back)
+
+    @property
+    def email_link(self):
+        """Generated link, the default template once over budget, or None while still waiting"""
+        return self.email_draft.link
+
+    @property
+    def finished(self):
+        return self.event_done and (self.event_error is not None or self.email_link is not None)
+
+
+def submit_confirmation(recruiter_email, candidate_email, slot, duration_minutes, event_id=None):
+    return ConfirmationJob(recruiter_email, candidate_email, slot, duration_minutes, event_id).submit()
@@ -0,0 +1,91 @@
+"""Content-addressed cache for generated invitation email templates.
+
+Gemini is asked for a reusable body per recruiter and tone, with placeholders
+for the per-event details (see email_templates.py). The key is a hash of the
+normalized prompt that produced it, so editing the prompt or changing tone
+naturally misses. Entries live in memory and, when
+``SCHEDULAI_EMAIL_CACHE_DB`` is set, in a SQLite file shared by every server
+process and kept across restarts.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import sqlite_util
+
+EMAIL_CACHE_DB = os.environ.get("SCHEDULAI_EMAIL_CACHE_DB")
+
+
+def content_key(prompt):
+    """Stable key for a prompt, insensitive to whitespace and case differences"""
+    normalized = " ".join(prompt.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmailTemplateCache:
+    """Prompt hash -> generated template body, in memory with an optional SQLite backing store"""
+
+    def __init__(self, db_path=EMAIL_CACHE_DB):
+        self.db_path = db_path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            with self._connect() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS email_templates "
+                    "(key TEXT PRIMARY KEY, body TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        # A connection per call, closed afterwards: sqlite3 connections can't be shared across threads
+        return sqlite_util.connect(self.db_path, timeout=5)
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+        if body is None and self.db_path:
+            with self._connect() as connection:
+                row = connection.execute("SELECT body FROM email_templates WHERE key = ?", (key,)).fetchone()
+            if row:
+                body = row[0]
+                with self._lock:
+                    self._entries[key] = body
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+        if self.db_path:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO email_templates (key, body, created_at) VALUES (?, ?, ?)",
+                    (key, body, time.time())
+                )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM email_templates")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+email_template_cache = EmailTemplateCache()
@@ -0,0 +1,271 @@
+"""Interview invitation emails: Gemini-generated body, default fallback and Gmail compose link.
+
+Gemini output is streamed on a background pool under a latency budget. If no
+text arrives within ``EMAIL_FIRST_TOKEN_SECONDS``, or the whole body isn't in
+by ``EMAIL_DEADLINE_SECONDS``, the default template is used at once; a
+generated email that arrives later can still be swapped in. Time to first
+chunk and the fallback rate are kept in ``email_metrics``.
+
+Gemini writes one reusable body per recruiter and tone, with placeholders for
+the event details. Bodies are cached by prompt (see email_cache.py) and filled
+in locally, so re-confirmations and later interviews for the same recruiter
+make no LLM call.
+"""
+import os
+import statistics
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import resources
+from email_cache import content_key, email_template_cache
+
+EMAIL_WORKERS = int(os.environ.get("SCHEDULAI_EMAIL_WORKERS", "4"))
+EMAIL_FIRST_TOKEN_SECONDS = float(os.environ.get("SCHEDULAI_EMAIL_FIRST_TOKEN", "3"))
+EMAIL_DEADLINE_SECONDS = float(os.environ.get("SCHEDULAI_EMAIL_DEADLINE", "8"))
+EMAIL_TONE = os.environ.get("SCHEDULAI_EMAIL_TONE", "professional but warm")
+EMAIL_PLACEHOLDERS = ("{date}", "{time}", "{duration}", "{calendar_link}")
+EMAIL_REQUEST_TIMEOUT_SECONDS = 60  # Hard cap so a stuck stream can't hold a worker forever
+
+_email_pool = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix="email-generate")
+
+
+def build_email_prompt(recruiter_email, tone=EMAIL_TONE):
+    """Prompt for a reusable invitation; per-event details are left as placeholders"""
+    return f"""
+        Generate a {tone} email template for an interview invitation from {recruiter_email}.
+        Use these exact placeholders for the interview details, each at least once:
+        - {{date}} for the interview date
+        - {{time}} for the interview time
+        - {{duration}} for the duration in minutes
+        - {{calendar_link}} for the calendar link
+
+        The email should:
+        1. Be {tone}
+        2. Include all scheduling details clearly
+        3. Have clear instructions to click the calendar link to accept the interview invite
+        4. Request the candidate to confirm receipt of the email
+        5. Mention the importance of being on time
+        6. Be concise but complete
+        7. Include the calendar link with instructions on how to add it to their calendar
+        8. Dont use any other placeholder any where. start with dear candidate. No need to specify name.
+        9. Don't include subject line.
+        10. Best regrads should be with the recruiter email.
+        11. Ask the candidate to click on the link or copy and paste it in the browser to add the event to their calendar.
+        12. follow the above pattern to generate the email.
+
+        Format the email with proper line breaks and spacing for readability.
+        """
+
+
+def fill_email_template(template, event_details, sharing_link):
+    """Put one event's details into a cached template body"""
+    values = {
+        "{date}": event_details['date'],
+        "{time}": event_details['time'],
+        "{duration}": str(event_details['duration']),
+        "{calendar_link}": sharing_link,
+    }
+    for placeholder, value in values.items():
+        template = template.replace(placeholder, value)
+    return template
+
+
+def default_email_body(event_details, sharing_link):
+    """Hard-coded invitation used whenever Gemini is unavailable"""
+    return f"""Dear Candidate,
+
+Thank you for your interest in our organization. We are pleased to schedule your interview:
+
+Date: {event_details['date']}
+Time: {event_details['time']} IST
+Duration: {event_details['duration']} minutes
+
+To add this event to your calendar, please click the following link:
+{sharing_link}
+
+Please confirm receipt of this email and the calendar invitation.
+
+Best regards,
+{event_details['recruiter']}"""
+
+
+def build_mailto_link(candidate_email, event_details, email_body):
+    """Gmail compose link pre-filled with the invitation"""
+    subject = f"Interview Scheduled: {event_details['date']}"
+    encoded_body = urllib.parse.quote(email_body)
+    return f'https://mail.google.com/mail/?view=cm&fs=1&to={candidate_email}&su={urllib.parse.quote(subject)}&body={encoded_body}'
+
+
+def default_email_link(event_details, sharing_link, candidate_email):
+    return build_mailto_link(candidate_email, event_details, default_email_body(event_details, sharing_link))
+
+
+class EmailMetrics:
+    """Time to first Gemini chunk and how often the default template is used"""
+
+    def __init__(self, max_samples=500):
+        self._lock = threading.Lock()
+        self._ttfb = deque(maxlen=max_samples)
+        self.generated = 0
+        self.fallbacks = 0
+        self.late_swaps = 0
+
+    def record_first_chunk(self, seconds):
+        with self._lock:
+            self._ttfb.append(seconds)
+
+    def record_outcome(self, fell_back):
+        with self._lock:
+            if fell_back:
+                self.fallbacks += 1
+            else:
+                self.generated += 1
+
+    def record_late_swap(self):
+        with self._lock:
+            self.late_swaps += 1
+
+    def stats(self):
+        with self._lock:
+            decided = self.generated + self.fallbacks
+            samples = sorted(self._ttfb)
+            return {
+                "generated": self.generated,
+                "fallbacks": self.fallbacks,
+                "late_swaps": self.late_swaps,
+                "fallback_rate": self.fallbacks / decided if decided else 0.0,
+                "ttfb_median_ms": statistics.median(samples) * 1000 if samples else None,
+                "ttfb_p95_ms": samples[int(0.95 * (len(samples) - 1))] * 1000 if samples else None,
+            }
+
+
+email_metrics = EmailMetrics()
+
+
+class EmailDraft:
+    """One invitation email streamed from Gemini in the background.
+
+    ``link`` is None while still inside the latency budget, then either the
+    generated link or the default one. Once the default has been handed out
+    the decision sticks; ``late_link`` gives the generated link if it turns
+    up afterwards.
+    """
+
+    def __init__(self, event_details, sharing_link, candidate_email, tone=EMAIL_TONE,
+                 first_token_seconds=EMAIL_FIRST_TOKEN_SECONDS, deadline_seconds=EMAIL_DEADLINE_SECONDS,
+                 metrics=email_metrics, cache=email_template_cache, clock=time.monotonic):
+        self.event_details = event_details
+        self.sharing_link = sharing_link
+        self.candidate_email = candidate_email
+        self.prompt = build_email_prompt(event_details['recruiter'], tone)
+        self.cache = cache
+        self.first_token_seconds = first_token_seconds
+        self.deadline_seconds = deadline_seconds
+        self.metrics = metrics
+        self._clock = clock
+        self.started_at = None
+        self.first_chunk_seconds = None
+        self.fell_back = None  # None until decided
+        self._late_swapped = False
+        self._progress = threading.Event()  # Set on the first chunk or when the stream ends
+        self._future = None
+
+    def start(self, pool=_email_pool):
+        self.started_at = self._clock()
+        cached = self.cache.get(content_key(self.prompt))
+        if cached is not None:
+            self._future = Future()
+            self._future.set_result(fill_email_template(cached, self.event_details, self.sharing_link))
+            self._progress.set()
+        else:
+            self._future = pool.submit(self._stream)
+        return self
+
+    def _stream(self):
+        try:
+            response = resources.get_model().generate_content(
+                self.prompt,
+                stream=True,
+                request_options={"timeout": EMAIL_REQUEST_TIMEOUT_SECONDS}
+            )
+            chunks = []
+            for chunk in response:
+                if self.first_chunk_seconds is None:
+                    self.first_chunk_seconds = self._clock() - self.started_at
+                    self.metrics.record_first_chunk(self.first_chunk_seconds)
+                    self._progress.set()
+                chunks.append(chunk.text)
+            template = "".join(chunks).strip()
+            missing = [placeholder for placeholder in EMAIL_PLACEHOLDERS if placeholder not in template]
+            if missing:
+                raise ValueError(f"Gemini email template is missing {', '.join(missing)}")
+            self.cache.put(content_key(self.prompt), template)
+            return fill_email_template(template, self.event_details, self.sharing_link)
+        finally:
+            self._progress.set()
+
+    def _generated_link(self):
+        if not self._future.done() or self._future.exception() is not None:
+            return None
+        return build_mailto_link(self.candidate_email, self.event_details, self._future.result())
+
+    def _decide(self):
+        if self.fell_back is not None:
+            return
+        elapsed = self._clock() - self.started_at
+        if self._future.done():
+            self.fell_back = self._future.exception() is not None
+        elif self.first_chunk_seconds is None and elapsed > self.first_token_seconds:
+            self.fell_back = True
+        elif elapsed > self.deadline_seconds:
+            self.fell_back = True
+        else:
+            return
+        self.metrics.record_outcome(self.fell_back)
+
+    @property
+    def link(self):
+        self._decide()
+        if self.fell_back is None:
+            return None
+        if self.fell_back:
+            return default_email_link(self.event_details, self.sharing_link, self.candidate_email)
+        return self._generated_link()
+
+    @property
+    def late_link(self):
+        """Generated link that arrived after the default was used, else None"""
+        if not self.fell_back:
+            return None
+        link = self._generated_link()
+        if link is not None and not self._late_swapped:
+            self._late_swapped = True
+            self.metrics.record_late_swap()
+        return link
+
+    @property
+    def stream_finished(self):
+        return self._future.done()
+
+    def wait(self):
+        """Block until the email or its fallback is decided; returns the link"""
+        if self._progress.wait(self.first_token_seconds):
+            remaining = self.deadline_seconds - (self._clock() - self.started_at)
+            try:
+                self._future.result(timeout=max(remaining, 0))
+            except Exception:
+                pass
+        return self.link
+
+
+def start_email_draft(event_details, sharing_link, candidate_email):
+    """Start streaming an invitation email in the background"""
+    return EmailDraft(event_details, sharing_link, candidate_email).start()
+
+
+def generate_email_template(event_details, sharing_link, candidate_email):
+    """Generate a professional email template using Gemini AI, within the latency budget"""
+    return start_email_draft(event_details, sharing_link, candidate_email).wait()
@@ -0,0 +1,154 @@
+"""Batched Calendar event writes.
+
+Inserts, updates and deletes are queued and sent through the Calendar batch
+endpoint (``service.new_batch_http_request``), at most ``BATCH_SIZE`` per HTTP
+round trip. Every item takes its tokens from the shared rate limiter
+(calendar_api.py) before it is queued into a batch. Every item gets its own
+result; only items that failed with a retryable error are sent again, with
+exponential backoff. If a whole batch round trip fails, each item in it gets
+that error.
+
+Inserts carry a client-generated event id, so resending one whose first
+attempt did land gets a 409 instead of a duplicate event; the existing event
+is then fetched and reported as the result.
+
+Pass ``http`` (e.g. ``googleapiclient.http.HttpMockSequence``) to run against a
+local fake transport.
+"""
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from calendar_api import CalendarAPIError, backoff_delay, error_status, is_retryable, rate_limiter
+from calendar_sync import calendar_sync
+from freebusy_cache import freebusy_cache
+
+BATCH_SIZE = 50  # Calendar API limit for calls in one batch request
+
+
+@dataclass
+class WriteResult:
+    """Outcome of one queued write"""
+    key: str
+    operation: str
+    calendar_id: str
+    response: Optional[dict] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+
+    @property
+    def ok(self):
+        return self.error is None and self.attempts > 0
+
+
+@dataclass
+class _Write:
+    key: str
+    operation: str
+    calendar_id: str
+    kwargs: dict = field(default_factory=dict)
+    result: Any = None
+
+
+class EventWriter:
+    """Queues event writes and flushes them as Calendar batch requests"""
+
+    def __init__(self, service, batch_size=BATCH_SIZE, max_retries=3, backoff_seconds=1.0,
+                 http=None, sleep=time.sleep, limiter=rate_limiter):
+        self.service = service
+        self.limiter = limiter
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.http = http
+        self._sleep = sleep
+        self._queue = []
+
+    def _add(self, operation, calendar_id, key, **kwargs):
+        key = key or f"{operation}-{len(self._queue)}"
+        write = _Write(key, operation, calendar_id, kwargs)
+        write.result = WriteResult(key, operation, calendar_id)
+        self._queue.append(write)
+        return key
+
+    def insert(self, calendar_id, body, key=None, send_updates="none"):
+        body = {"id": uuid.uuid4().hex, **body}  # Makes resending the insert idempotent
+        return self._add("insert", calendar_id, key, body=body, sendUpdates=send_updates)
+
+    def update(self, calendar_id, event_id, body, key=None, send_updates="none"):
+        return self._add("update", calendar_id, key, eventId=event_id, body=body, sendUpdates=send_updates)
+
+    def delete(self, calendar_id, event_id, key=None, send_updates="none"):
+        return self._add("delete", calendar_id, key, eventId=event_id, sendUpdates=send_updates)
+
+    def _request(self, write):
+        # Fresh request objects on every attempt; a batch can't resend old ones
+        events = self.service.events()
+        return getattr(events, write.operation)(calendarId=write.calendar_id, **write.kwargs)
+
+    def _send_batch(self, writes):
+        by_id = {str(i): write for i, write in enumerate(writes)}
+
+        def callback(request_id, response, exception):
+            result = by_id[request_id].result
+            result.response = response
+            result.error = exception
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        queued = 0
+        for request_id, write in by_id.items():
+            write.result.attempts += 1
+            write.result.response = write.result.error = None
+            try:
+                self.limiter.acquire([write.calendar_id])
+            except CalendarAPIError as error:
+                write.result.error = error  # Turned away locally; retried with the other failures
+                continue
+            batch.add(self._request(write), request_id=request_id)
+            queued += 1
+        if not queued:
+            return
+        try:
+            batch.execute(http=self.http)
+        except Exception as error:
+            # The round trip itself failed (e.g. a 503 for the whole batch); items without an answer share it
+            for write in writes:
+                if write.result.response is None and write.result.error is None:
+                    write.result.error = error
+
+    def _fetch_existing(self, writes):
+        """Report the already-inserted event for inserts refused with 409"""
+        lookups = [
+            _Write(write.key, "get", write.calendar_id, {"eventId": write.kwargs["body"]["id"]}) for write in writes
+        ]
+        for lookup in lookups:
+            lookup.result = WriteResult(lookup.key, "get", lookup.calendar_id)
+        self._send_batch(lookups)
+        for write, lookup in zip(writes, lookups):
+            if lookup.result.error is None:
+                write.result.response, write.result.error = lookup.result.response, None
+
+    def execute(self):
+        """Send everything queued; returns ``{key: WriteResult}`` in queue order"""
+        writes, self._queue = self._queue, []
+        pending = writes
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponential backoff with jitter before retrying the failed items only
+                self._sleep(backoff_delay(attempt, self.backoff_seconds))
+            for offset in range(0, len(pending), self.batch_size):
+                self._send_batch(pending[offset:offset + self.batch_size])
+            pending = [write for write in pending if write.result.error is not None and is_retryable(write.result.error)]
+            if not pending:
+                break
+
+        # The event id was taken by an earlier attempt of the same insert, so it did land
+        landed = [write for write in writes if write.operation == "insert" and error_status(write.result.error) == 409]
+        for offset in range(0, len(landed), self.batch_size):
+            self._fetch_existing(landed[offset:offset + self.batch_size])
+
+        for calendar_id in {write.calendar_id for write in writes if write.result.ok}:
+            freebusy_cache.invalidate(calendar_id)  # Busy times changed for these calendars
+            calendar_sync.mark_stale(calendar_id)
+        return {write.key: write.result for write in writes}
@@ -0,0 +1,124 @@
+"""Process-wide TTL + LRU cache for Calendar freebusy responses.
+
+Entries are stored per calendar and window, so a cached window also answers
+any query for a sub-range of it. A calendar's entries are dropped whenever the
+bot inserts an event into it.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from calendar_api import execute
+
+FREEBUSY_TTL_SECONDS = float(os.environ.get("SCHEDULAI_FREEBUSY_TTL", "120"))
+FREEBUSY_MAX_ENTRIES = int(os.environ.get("SCHEDULAI_FREEBUSY_MAX_ENTRIES", "512"))
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FreeBusyCache:
+    """Caches each calendar's freebusy payload for a (timeMin, timeMax) window"""
+
+    def __init__(self, ttl_seconds=FREEBUSY_TTL_SECONDS, max_entries=FREEBUSY_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # (calendar_id, time_min, time_max) -> (stored_at, calendar payload), in LRU order
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, calendar_id, time_min, time_max):
+        """Cached payload covering the window, trimmed to it, or None"""
+        start, end = _parse(time_min), _parse(time_max)
+        now = self._clock()
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != calendar_id:
+                    continue
+                stored_at, payload = self._entries[key]
+                if now - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                if key[1] <= start and end <= key[2]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._trim(payload, start, end)
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _trim(payload, start, end):
+        if "errors" in payload:
+            return payload
+        busy = [
+            slot for slot in payload.get("busy", [])
+            if _parse(slot["start"]) < end and _parse(slot["end"]) > start
+        ]
+        return {**payload, "busy": busy}
+
+    def put(self, calendar_id, time_min, time_max, payload):
+        key = (calendar_id, _parse(time_min), _parse(time_max))
+        with self._lock:
+            self._entries[key] = (self._clock(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, calendar_id):
+        """Forget every cached window for a calendar (e.g. after inserting an event)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == calendar_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+freebusy_cache = FreeBusyCache()
+
+
+def cached_freebusy_query(service, body, cache=freebusy_cache):
+    """Drop-in for ``service.freebusy().query(body=body).execute()`` backed by the cache.
+
+    Only calendars without a fresh covering entry are sent to the API, all in one request.
+    """
+    time_min, time_max = body["timeMin"], body["timeMax"]
+    calendars = {}
+    missing = []
+    for item in body["items"]:
+        payload = cache.get(item["id"], time_min, time_max)
+        if payload is None:
+            missing.append(item)
+        else:
+            calendars[item["id"]] = payload
+
+    if missing:
+        response = execute(
+            service.freebusy().query(body={**body, "items": missing}),
+            calendar_ids=[item["id"] for item in missing]
+        )
+        for calendar_id, payload in response.get("calendars", {}).items():
+            cache.put(calendar_id, time_min, time_max, payload)
+            calendars[calendar_id] = payload
+
+    return {"timeMin": time_min, "timeMax": time_max, "calendars": calendars}
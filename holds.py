@@ -0,0 +1,233 @@
+"""Short-lived slot holds so concurrent sessions can't book the same interval.
+
+Selecting a slot takes a hold on the recruiter's and candidate's calendars for
+that interval. Other sessions see held intervals as busy, so they are left out
+of their slot lists, and a second hold on an overlapping interval is refused.
+Holds are released on "Change Date/Time", on reset, or when they expire after
+``SCHEDULAI_HOLD_SECONDS``. A confirmed slot keeps its hold for one freebusy
+cache lifetime, so workers still caching the calendars from before the insert
+don't offer it again.
+
+Holds live in process memory by default. Set ``SCHEDULAI_HOLDS_DB`` to a SQLite
+file to share them between several server processes.
+"""
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+import sqlite_util
+from availability import IST
+
+HOLD_SECONDS = float(os.environ.get("SCHEDULAI_HOLD_SECONDS", "300"))
+HOLDS_DB = os.environ.get("SCHEDULAI_HOLDS_DB")
+
+
+@dataclass
+class Hold:
+    hold_id: str
+    owner: str
+    calendar_ids: tuple
+    start: datetime
+    end: datetime
+    expires_at: float
+
+
+class HoldMetrics:
+    """Hold outcomes plus how often, and how long, callers waited on the store's lock"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.conflicts = 0
+        self.released = 0
+        self.lock_contended = 0
+        self.lock_wait_seconds = 0.0
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self):
+        with self._lock:
+            attempts = self.acquired + self.conflicts
+            return {
+                "acquired": self.acquired,
+                "conflicts": self.conflicts,
+                "released": self.released,
+                "conflict_rate": self.conflicts / attempts if attempts else 0.0,
+                "lock_contended": self.lock_contended,
+                "lock_wait_seconds": self.lock_wait_seconds,
+            }
+
+
+class MemoryHoldStore:
+    """Holds for a single server process"""
+
+    def __init__(self, hold_seconds=HOLD_SECONDS, clock=time.time):
+        self.hold_seconds = hold_seconds
+        self._clock = clock
+        self._holds = {}  # hold id -> Hold
+        self._lock = threading.Lock()
+        self.metrics = HoldMetrics()
+
+    @contextmanager
+    def _locked(self):
+        started = time.perf_counter()
+        if not self._lock.acquire(blocking=False):
+            self._lock.acquire()
+            self.metrics.record(lock_contended=1, lock_wait_seconds=time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _purge(self, now):
+        for hold_id in [hold_id for hold_id, hold in self._holds.items() if hold.expires_at <= now]:
+            del self._holds[hold_id]
+
+    def _overlapping(self, calendar_ids, start, end, exclude_owner):
+        return [
+            hold for hold in self._holds.values()
+            if hold.owner != exclude_owner and set(hold.calendar_ids) & set(calendar_ids)
+            and hold.start < end and start < hold.end
+        ]
+
+    def acquire(self, owner, calendar_ids, start, end):
+        """Hold the interval on every calendar, or return None if another owner holds part of it"""
+        with self._locked():
+            now = self._clock()
+            self._purge(now)
+            if self._overlapping(calendar_ids, start, end, owner):
+                self.metrics.record(conflicts=1)
+                return None
+            hold = Hold(uuid.uuid4().hex, owner, tuple(calendar_ids), start, end, now + self.hold_seconds)
+            self._holds[hold.hold_id] = hold
+        self.metrics.record(acquired=1)
+        return hold
+
+    def is_active(self, hold):
+        with self._locked():
+            current = self._holds.get(hold.hold_id)
+            return current is not None and current.expires_at > self._clock()
+
+    def extend(self, hold, seconds):
+        """Keep the hold for ``seconds`` from now"""
+        with self._locked():
+            current = self._holds.get(hold.hold_id)
+            if current is not None:
+                current.expires_at = self._clock() + seconds
+
+    def release(self, hold):
+        with self._locked():
+            released = self._holds.pop(hold.hold_id, None) is not None
+        if released:
+            self.metrics.record(released=1)
+
+    def held_intervals(self, calendar_id, start, end, exclude_owner=None):
+        """Other owners' unexpired holds on a calendar overlapping the window"""
+        with self._locked():
+            self._purge(self._clock())
+            return [
+                {"start": hold.start, "end": hold.end}
+                for hold in self._overlapping([calendar_id], start, end, exclude_owner)
+            ]
+
+
+class SQLiteHoldStore(MemoryHoldStore):
+    """Holds shared by every process using the same SQLite file"""
+
+    def __init__(self, path, hold_seconds=HOLD_SECONDS, clock=time.time):
+        super().__init__(hold_seconds, clock)
+        self.path = path
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS holds (hold_id TEXT, owner TEXT, calendar_id TEXT, "
+                "start REAL, end REAL, expires_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS holds_calendar ON holds (calendar_id, start)")
+
+    def _connect(self):
+        # Closed after each call; autocommit so _transaction controls BEGIN IMMEDIATE itself
+        return sqlite_util.connect(self.path, timeout=10, isolation_level=None)
+
+    def _transaction(self, connection):
+        # BEGIN IMMEDIATE takes the write lock up front, so check-then-insert is atomic across processes
+        started = time.perf_counter()
+        connection.execute("BEGIN IMMEDIATE")  # Waits up to the connection timeout for other writers
+        waited = time.perf_counter() - started
+        if waited > 0.001:
+            self.metrics.record(lock_contended=1, lock_wait_seconds=waited)
+
+    @staticmethod
+    def _overlap_query(calendar_ids):
+        marks = ",".join("?" * len(calendar_ids))
+        return (
+            f"SELECT start, end FROM holds WHERE calendar_id IN ({marks}) AND owner != ? "
+            "AND expires_at > ? AND start < ? AND end > ?"
+        )
+
+    def acquire(self, owner, calendar_ids, start, end):
+        now = self._clock()
+        calendar_ids = list(dict.fromkeys(calendar_ids))
+        with self._connect() as connection:
+            self._transaction(connection)
+            try:
+                connection.execute("DELETE FROM holds WHERE expires_at <= ?", (now,))
+                conflict = connection.execute(
+                    self._overlap_query(calendar_ids),
+                    (*calendar_ids, owner, now, end.timestamp(), start.timestamp())
+                ).fetchone()
+                if conflict:
+                    connection.execute("COMMIT")
+                    self.metrics.record(conflicts=1)
+                    return None
+                hold = Hold(uuid.uuid4().hex, owner, tuple(calendar_ids), start, end, now + self.hold_seconds)
+                connection.executemany(
+                    "INSERT INTO holds VALUES (?, ?, ?, ?, ?, ?)",
+                    [(hold.hold_id, owner, calendar_id, start.timestamp(), end.timestamp(), hold.expires_at)
+                     for calendar_id in calendar_ids]
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        self.metrics.record(acquired=1)
+        return hold
+
+    def is_active(self, hold):
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM holds WHERE hold_id = ? AND expires_at > ?", (hold.hold_id, self._clock())
+            ).fetchone()
+        return row is not None
+
+    def extend(self, hold, seconds):
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE holds SET expires_at = ? WHERE hold_id = ?", (self._clock() + seconds, hold.hold_id)
+            )
+
+    def release(self, hold):
+        with self._connect() as connection:
+            released = connection.execute("DELETE FROM holds WHERE hold_id = ?", (hold.hold_id,)).rowcount
+        if released:
+            self.metrics.record(released=1)
+
+    def held_intervals(self, calendar_id, start, end, exclude_owner=None):
+        with self._connect() as connection:
+            rows = connection.execute(
+                self._overlap_query([calendar_id]),
+                (calendar_id, exclude_owner or "", self._clock(), end.timestamp(), start.timestamp())
+            ).fetchall()
+        return [
+            {"start": datetime.fromtimestamp(row[0], IST), "end": datetime.fromtimestamp(row[1], IST)}
+            for row in rows
+        ]
+
+
+hold_store = SQLiteHoldStore(HOLDS_DB) if HOLDS_DB else MemoryHoldStore()
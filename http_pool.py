@@ -0,0 +1,183 @@
+"""Thread-safe pooled HTTP transport for the Calendar client.
+
+httplib2 clients are not thread-safe, yet one Calendar service object is
+shared by every Streamlit session. ``HttpPool`` stands in for the single
+``http`` object googleapiclient expects: each request checks out one of up to
+``SCHEDULAI_HTTP_POOL_SIZE`` authorized httplib2 clients, so concurrent
+sessions never share a connection, and returns it afterwards so its
+keep-alive connections are reused by the next request.
+
+Run ``python http_pool.py`` to compare pool sizes against a local stub server.
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+HTTP_POOL_SIZE = int(os.environ.get("SCHEDULAI_HTTP_POOL_SIZE", "8"))
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("SCHEDULAI_HTTP_TIMEOUT", "30"))
+
+
+class HttpPool:
+    """Drop-in for an httplib2 ``Http`` that spreads requests over a fixed set of clients"""
+
+    def __init__(self, credentials=None, size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT_SECONDS, http_factory=None):
+        self.credentials = credentials  # Read by googleapiclient when refreshing batch requests
+        self.size = size
+        self.timeout = timeout
+        self._http_factory = http_factory
+        self._idle = queue.LifoQueue()  # Most recently used first, so warm connections are reused
+        self._created = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waits = 0
+
+    def _new_http(self):
+        import httplib2
+
+        http = self._http_factory() if self._http_factory else httplib2.Http(timeout=self.timeout)
+        if self.credentials is None:
+            return http
+        import google_auth_httplib2
+
+        return google_auth_httplib2.AuthorizedHttp(self.credentials, http=http)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+            else:
+                self.waits += 1
+        if create:
+            return self._new_http()
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Exclusive use of one pooled client for the duration of the block"""
+        http = self._checkout()
+        try:
+            yield http
+        except Exception:
+            # The connection may be half-used; close it so the next user reconnects cleanly
+            _close(http)
+            raise
+        finally:
+            self._idle.put(http)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self._lock:
+            self.requests += 1
+        with self.connection() as http:
+            return http.request(uri, method=method, body=body, headers=headers, **kwargs)
+
+    def close(self):
+        while True:
+            try:
+                _close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": self._idle.qsize(),
+                "requests": self.requests,
+                "waits": self.waits,
+            }
+
+
+def _close(http):
+    close = getattr(http, "close", None) or getattr(getattr(http, "http", None), "close", None)
+    if close:
+        close()
+
+
+# 📌 Local benchmark against a stub Calendar server
+def _start_stub_server(latency_seconds):
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    connections = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive
+
+        def do_POST(self):
+            connections.add(self.client_address)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_seconds)
+            body = json.dumps({"kind": "calendar#freeBusy", "calendars": {}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, connections
+
+
+def benchmark(pool_sizes=(1, 4, 8), sessions=16, requests_per_session=10, latency_seconds=0.02):
+    """Freebusy throughput from ``sessions`` threads sharing one service, per pool size"""
+    import calendar_discovery
+
+    server, connections = _start_stub_server(latency_seconds)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+    body = {"timeMin": "2025-01-01T00:00:00Z", "timeMax": "2025-01-02T00:00:00Z", "items": [{"id": "a@example.com"}]}
+    results = []
+    try:
+        for size in pool_sizes:
+            pool = HttpPool(size=size)
+            service = calendar_discovery.build_calendar_service(http=pool, client_options={"api_endpoint": endpoint})
+            connections.clear()
+
+            def session():
+                for _ in range(requests_per_session):
+                    service.freebusy().query(body=body).execute()
+
+            threads = [threading.Thread(target=session) for _ in range(sessions)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            results.append({
+                "pool_size": size,
+                "requests_per_second": sessions * requests_per_session / elapsed,
+                "connections": len(connections),
+                **pool.stats(),
+            })
+            pool.close()
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled Calendar transport against a local stub server")
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent sessions")
+    parser.add_argument("--requests", type=int, default=10, help="requests per session")
+    parser.add_argument("--sizes", default="1,4,8", help="comma-separated pool sizes to compare")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    for result in benchmark(sizes, args.sessions, args.requests):
+        print(
+            f"⏱️ pool {result['pool_size']:>2}: {result['requests_per_second']:7.1f} req/s, "
+            f"{result['requests']} requests over {result['connections']} connections"
+        )
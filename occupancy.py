@@ -0,0 +1,120 @@
+"""Vectorized minute-resolution occupancy engine for slot search.
+
+Each search window (a day, or a multi-day range) becomes a NumPy array with
+one entry per minute. Busy intervals of every attendee are added through a
+single difference array, valid interview starts are found with a cumulative
+sum window test, and slots are only materialized as dicts when read.
+
+Results match ``availability.compute_availability`` exactly. Windows whose
+busy boundaries are not whole minutes from the window start cannot be
+represented and return ``None`` so the caller can use the sweep engine.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from availability import (
+    SLOT_INCREMENT_MINUTES,
+    SlotList,
+    merge_busy_intervals,
+)
+
+
+def _minute_offset(window_start, moment):
+    """Whole minutes between window start and ``moment``, or None if not minute aligned"""
+    seconds = (moment - window_start).total_seconds()
+    if seconds % 60:
+        return None
+    return int(seconds // 60)
+
+
+def _busy_counts(busy_lists, window_start, total_minutes):
+    """Number of attendees busy in each minute of the window"""
+    diff = np.zeros(total_minutes + 1, dtype=np.int32)
+    starts, ends = [], []
+    for busy in busy_lists:
+        for slot in busy:
+            start = _minute_offset(window_start, slot["start"])
+            end = _minute_offset(window_start, slot["end"])
+            if start is None or end is None:
+                return None
+            starts.append(start)
+            ends.append(end)
+    if starts:
+        np.add.at(diff, np.asarray(starts), 1)
+        np.add.at(diff, np.asarray(ends), -1)
+    return np.cumsum(diff[:-1])
+
+
+def _runs(free):
+    """Start and end indices of every run of True values"""
+    padded = np.concatenate(([False], free, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def compute_availability_bitmap(busy_by_attendee, window_start, window_end, duration_minutes,
+                                working_hours=None, required=None, optional=None, quorum=0):
+    """Bitmap equivalent of ``availability.compute_availability``; None if the window can't be represented"""
+    optional = set(optional or ())
+    if required is None:
+        required = [attendee for attendee in busy_by_attendee if attendee not in optional]
+
+    window_seconds = (window_end - window_start).total_seconds()
+    # Minutes the window touches, and the whole minutes usable for slots
+    total_minutes = int(-(-window_seconds // 60))
+    usable_minutes = int(window_seconds // 60)
+
+    if quorum > len(optional) or total_minutes <= 0:
+        return {"common_free_slots": [], "split_slots": SlotList(window_start, [], duration_minutes)}
+
+    # Clip busy time to the minutes the window touches, so a block running past a window that ends at
+    # 23:59:59.999999 (a full day) still lands on a minute boundary
+    grid_end = window_start + timedelta(minutes=total_minutes)
+
+    def merged(attendees):
+        return [
+            merge_busy_intervals(busy_by_attendee.get(attendee, []), window_start, grid_end)
+            for attendee in attendees
+        ]
+
+    required_busy = _busy_counts(merged(required), window_start, total_minutes)
+    optional_busy = _busy_counts(merged(sorted(optional)), window_start, total_minutes)
+    if required_busy is None or optional_busy is None:
+        return None
+
+    free = (required_busy == 0) & (optional_busy <= len(optional) - quorum)
+
+    # Common free blocks; a block touching the window end ends exactly there
+    run_starts, run_ends = _runs(free)
+    common_free_slots = []
+    for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+        block_end = window_end if end == total_minutes else window_start + timedelta(minutes=end)
+        common_free_slots.append({"start": window_start + timedelta(minutes=start), "end": block_end})
+
+    # Valid starts: the next `duration` usable minutes are all free...
+    usable = free[:usable_minutes]
+    if duration_minutes <= 0 or usable_minutes < duration_minutes:
+        starts = np.empty(0, dtype=np.int64)
+    else:
+        busy_prefix = np.concatenate(([0], np.cumsum(~usable)))
+        window_busy = busy_prefix[duration_minutes:] - busy_prefix[:-duration_minutes]
+        candidates = np.flatnonzero(window_busy == 0)
+
+        # ...and sit on the 5-minute grid anchored at their free block's start
+        block_index = np.searchsorted(run_starts, candidates, side="right") - 1
+        aligned = (candidates - run_starts[block_index]) % SLOT_INCREMENT_MINUTES == 0
+        starts = candidates[aligned]
+
+    if working_hours:
+        start_hour, end_hour = working_hours
+        base_minute = window_start.hour * 60 + window_start.minute
+        slot_start_hours = (base_minute + starts) // 60 % 24
+        slot_end_hours = (base_minute + starts + duration_minutes) // 60 % 24
+        starts = starts[(start_hour <= slot_start_hours) & (slot_end_hours <= end_hour)]
+
+    return {
+        "common_free_slots": common_free_slots,
+        "split_slots": SlotList(window_start, starts, duration_minutes),
+    }
+
@@ -0,0 +1,501 @@
+"""Natural-language parsers for the scheduling conversation.
+
+Patterns are compiled once at import, and dateparser runs as a single shared
+parser restricted to ``SCHEDULAI_DATE_LANGUAGES`` (see resources.py). Results
+for whitespace- and case-normalized inputs are memoized; the date caches are
+cleared when the day changes, since "tomorrow" means something else then.
+
+Run ``python parsers.py`` for a per-call latency benchmark.
+"""
+import argparse
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import resources
+
+PARSE_CACHE_SIZE = int(os.environ.get("SCHEDULAI_PARSE_CACHE_SIZE", "1024"))
+
+
+def _normalize(text):
+    return " ".join(str(text).lower().split())
+
+
+# 📌 Email extraction
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+
+# Only the entity recognizer is consulted, so everything else is skipped
+UNUSED_EMAIL_COMPONENTS = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter")
+
+
+def _regex_emails(text):
+    """Regex matches in order of appearance, lower-cased and de-duplicated"""
+    return list(dict.fromkeys(EMAIL_PATTERN.findall(text.lower())))
+
+
+def _is_ambiguous(text, emails):
+    """True when the regex found nothing but the text still looks like it holds an address"""
+    return not emails and "@" in text
+
+
+def _disabled_components(nlp):
+    return [name for name in UNUSED_EMAIL_COMPONENTS if name in nlp.pipe_names]
+
+
+def _emails_from_doc(doc, emails):
+    """Add email-like entities and tokens found by spaCy to ``emails``"""
+    candidates = [ent.text for ent in doc.ents if ent.label_ == "EMAIL" or "@" in ent.text]
+    candidates.extend(token.text for token in doc if token.like_email)
+    for candidate in candidates:
+        email = candidate.strip().lower()
+        if EMAIL_PATTERN.match(email) and email not in emails:
+            emails.append(email)
+    return emails
+
+
+def extract_emails(text):
+    """Extract email addresses from text using regex, falling back to NLP for ambiguous input"""
+    emails = _regex_emails(text)
+    if not _is_ambiguous(text, emails):
+        return emails
+
+    nlp = resources.get_nlp()
+    doc = nlp(text, disable=_disabled_components(nlp))
+    return _emails_from_doc(doc, emails)
+
+
+def extract_emails_batch(texts, batch_size=64):
+    """Extract emails from many texts, running NLP once over just the ambiguous ones"""
+    results = [_regex_emails(text) for text in texts]
+    ambiguous = [i for i, text in enumerate(texts) if _is_ambiguous(text, results[i])]
+    if not ambiguous:
+        return results
+
+    nlp = resources.get_nlp()
+    docs = nlp.pipe(
+        (texts[i] for i in ambiguous),
+        batch_size=batch_size,
+        disable=_disabled_components(nlp),
+    )
+    for i, doc in zip(ambiguous, docs):
+        _emails_from_doc(doc, results[i])
+    return results
+
+
+# 📌 Durations
+_DURATION_HOURS_PATTERN = re.compile(r'(\d+)\s*(?:hour|hr)s?')
+_DURATION_MINUTES_PATTERN = re.compile(r'(\d+)\s*(?:minute|min)s?')
+_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+
+def extract_duration(text):
+    """Extract duration in minutes from text"""
+    return _duration(_normalize(text))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _duration(text):
+    total_minutes = 0
+    
+    # Handle combined hour and minute patterns
+    hour_match = _DURATION_HOURS_PATTERN.search(text)
+    minute_match = _DURATION_MINUTES_PATTERN.search(text)
+    
+    if hour_match:
+        total_minutes += int(hour_match.group(1)) * 60
+    if minute_match:
+        total_minutes += int(minute_match.group(1))
+    
+    if total_minutes > 0:
+        return total_minutes
+        
+    # Fallback: Try to extract just numbers (assume minutes)
+    match = _NUMBER_PATTERN.search(text)
+    if match:
+        num = int(match.group(1))
+        # If number is less than 8, assume hours
+        if num < 8:
+            return num * 60
+        return num
+    
+    return None
+
+
+# 📌 Working hours
+# Time patterns like "9 am to 5 pm" or "9:00 to 17:00"
+_WORKING_HOURS_PATTERNS = (
+    re.compile(r'(\d{1,2})(?::?\d{2})?\s*(?:am|pm)?\s*(?:to|-)\s*(\d{1,2})(?::?\d{2})?\s*(?:am|pm)'),
+    re.compile(r'(\d{1,2})(?::?\d{2})?\s*(?:to|-)\s*(\d{1,2})(?::?\d{2})?'),
+)
+
+
+def extract_working_hours(text):
+    """Extract working hours from natural language text"""
+    return _working_hours(_normalize(text))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _working_hours(text):
+    for pattern in _WORKING_HOURS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            start_time, end_time = match.groups()
+            
+            # Convert to 24-hour format
+            start_hour = int(start_time)
+            end_hour = int(end_time)
+            
+            # Handle AM/PM if present
+            if 'pm' in text:
+                if end_hour != 12:
+                    end_hour += 12
+                if 'am' not in text and start_hour != 12:
+                    start_hour += 12
+            
+            # Basic validation
+            if 0 <= start_hour <= 23 and 0 <= end_hour <= 23:
+                return start_hour, end_hour
+            
+    return None
+
+
+# 📌 Single dates
+_cache_day = None
+
+
+def _today():
+    """Today's date, clearing the date caches the first time it changes"""
+    global _cache_day
+    today = date.today()
+    if today != _cache_day:
+        _parse_date.cache_clear()
+        _date_range.cache_clear()
+        _cache_day = today
+    return today
+
+
+@lru_cache(maxsize=8)
+def _relative_date_parser(relative_base):
+    return resources.build_date_parser(datetime.combine(relative_base, datetime.min.time()))
+
+
+def parse(text, relative_base=None):
+    """Future-preferring datetime for ``text``, or None.
+
+    The shared parser (built lazily, or at warm-up) is used unless dates are
+    relative to a day other than today.
+    """
+    if relative_base is None or relative_base == date.today():
+        parser = resources.get_date_parser()
+    else:
+        parser = _relative_date_parser(relative_base)
+    return parser.get_date_data(text).date_obj
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_date(text):
+    parsed = parse(text)
+    return parsed.date() if parsed else None
+
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_WEEKDAY_PATTERN = re.compile(r'^(?:(this|next|coming)\s+)?(mon|tue|wed|thu|fri|sat|sun)[a-z]*$')
+
+
+def _weekday_date(text, today=None):
+    """Dates like 'Tuesday' or 'next Tuesday', which dateparser doesn't handle with a qualifier"""
+    match = _WEEKDAY_PATTERN.match(text)
+    if not match or not any(day.startswith(text.split()[-1]) for day in _WEEKDAYS):
+        return None
+    today = today or date.today()
+    weekday = [day[:3] for day in _WEEKDAYS].index(match.group(2))
+    days_ahead = (weekday - today.weekday()) % 7
+    if days_ahead == 0 and match.group(1):
+        days_ahead = 7  # "next Tuesday" said on a Tuesday means the following one
+    return today + timedelta(days=days_ahead)
+
+
+def extract_date(text):
+    """Extract date from text using dateparser's natural language processing"""
+    # Clean up input
+    text = _normalize(text)
+    today = _today()
+    
+    weekday = _weekday_date(text, today)
+    if weekday:
+        return weekday
+    
+    # Let dateparser handle all natural language date parsing
+    return _parse_date(text)
+
+
+def validate_date(date_str):
+    """Validate date string using natural language processing"""
+    try:
+        # First try to parse as natural language date
+        _today()  # Drops dates cached on a previous day
+        date = _parse_date(_normalize(date_str))
+        if date is None:
+            # Fallback to strict format if natural language parsing fails
+            date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        
+        today = datetime.now().date()
+        if date < today:
+            return False, "The interview date you provided is in the past. Please provide a valid future date or today's date."
+        return True, date
+    except (ValueError, TypeError):
+        return False, "I couldn't understand the date format. Please provide a date like 'next Monday', 'March 25th', or 'YYYY-MM-DD'."
+
+
+# 📌 Date ranges ("next week", "any day before the 30th", "between Monday and Thursday")
+MAX_RANGE_DAYS = 31
+
+_WEEK_PATTERN = re.compile(r'\b(this|next)\s+week\b')
+_NEXT_DAYS_PATTERN = re.compile(r'\b(?:in\s+|within\s+|over\s+)?(?:the\s+)?next\s+(\d+)\s+(day|week)s?\b')
+_BEFORE_PATTERN = re.compile(r'\b(before|by|until|till)\s+(.+)$')
+_BETWEEN_PATTERN = re.compile(r'\b(?:between\s+(.+?)\s+and|from\s+(.+?)\s+(?:to|until|till))\s+(.+)$')
+_DAY_OF_MONTH_PATTERN = re.compile(r'^(?:the\s+)?(\d{1,2})(?:st|nd|rd|th)?$')
+
+
+def _next_day_of_month(day, today):
+    """Next date (today included) falling on the given day of the month"""
+    year, month = today.year, today.month
+    for _ in range(12):
+        try:
+            candidate = today.replace(year=year, month=month, day=day)
+        except ValueError:
+            candidate = None
+        if candidate is not None and candidate >= today:
+            return candidate
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return None
+
+
+def _week_start(which, today):
+    monday = today - timedelta(days=today.weekday())
+    return monday + timedelta(days=7) if which == "next" else monday
+
+
+def _clean_endpoint(text):
+    return text.strip().rstrip('.?!').strip()
+
+
+def _parse_range_endpoint(text, today):
+    text = _clean_endpoint(text)
+    match = _WEEK_PATTERN.fullmatch(text)
+    if match:
+        return _week_start(match.group(1), today)  # "until next week" ends where next week starts
+    match = _DAY_OF_MONTH_PATTERN.match(text)
+    if match:
+        return _next_day_of_month(int(match.group(1)), today)
+    weekday = _weekday_date(text, today)
+    if weekday:
+        return weekday
+    if today == _cache_day:
+        return _parse_date(text)
+    parsed = parse(text, relative_base=today)
+    return parsed.date() if parsed else None
+
+
+def extract_date_range(text, today=None):
+    """Extract an inclusive (start_date, end_date) range from phrases like 'next week'.
+
+    Returns None when the text names a single date rather than a range.
+    Ranges never start in the past and are capped at ``MAX_RANGE_DAYS`` days.
+    """
+    return _date_range(_normalize(text), today or _today())
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _date_range(text, today):
+    start = end = None
+
+    # A week inside "until next week" or "from today to next week" is an endpoint, not the range
+    endpoint = _BETWEEN_PATTERN.search(text) or _BEFORE_PATTERN.search(text)
+    match = _WEEK_PATTERN.search(text)
+    if match and not (endpoint and match.start() > endpoint.start()):
+        monday = _week_start(match.group(1), today)
+        start, end = monday, monday + timedelta(days=6)
+
+    if start is None:
+        match = _NEXT_DAYS_PATTERN.search(text)
+        if match:
+            days = int(match.group(1)) * (7 if match.group(2) == "week" else 1)
+            start, end = today, today + timedelta(days=max(days - 1, 0))
+
+    if start is None:
+        match = _BETWEEN_PATTERN.search(text)
+        if match:
+            start = _parse_range_endpoint(match.group(1) or match.group(2), today)
+            end = _parse_range_endpoint(match.group(3), today)
+            if start is None or end is None:
+                return None
+
+    if start is None:
+        match = _BEFORE_PATTERN.search(text)
+        if match:
+            end = _parse_range_endpoint(match.group(2), today)
+            if end is None:
+                return None
+            if match.group(1) == "before" or _WEEK_PATTERN.fullmatch(_clean_endpoint(match.group(2))):
+                end -= timedelta(days=1)
+            start = today
+
+    if start is None:
+        return None
+
+    start = max(start, today)
+    end = min(end, start + timedelta(days=MAX_RANGE_DAYS - 1))
+    if end < start:
+        return None
+    return start, end
+
+
+# 📌 Whole requests ("schedule a@x.com with b@y.com for 45 min next Tuesday 10am-6pm")
+_INTENT_HOURS_PATTERN = re.compile(
+    r'\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:to|-|–)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b'
+)
+_INTENT_DURATION_PATTERN = re.compile(r'\b(\d+)\s*(hours?|hrs?|minutes?|mins?)\b')
+_INTENT_FILLER = {
+    "please", "can", "you", "could", "schedule", "book", "set", "up", "arrange", "an", "a", "the",
+    "interview", "meeting", "call", "with", "for", "on", "at", "i", "am", "my", "email", "is",
+    "recruiter", "candidate", "working", "hours", "of", "duration", "long", "slot",
+}
+_INTENT_WORD_SPLIT = re.compile(r'[\s,;!?]+')
+_INTENT_CLOCK_PATTERN = re.compile(r'\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b')
+# Real date words or numeric dates only: a bare "45" or "3pm" left in a message is never a date
+_DATE_HINT = re.compile(
+    r'\b(?:today|tomorrow|tmrw|week|days?|next|this|coming|before|until|till|between|from|'
+    r'mon|tue|wed|thu|fri|sat|sun|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)|'
+    r'\b\d{1,2}(?:st|nd|rd|th)\b|\b\d{1,4}[/.-]\d{1,2}(?:[/.-]\d{1,4})?\b'
+)
+
+
+def _to_24_hour(hour, meridiem):
+    if meridiem == "pm" and hour != 12:
+        return hour + 12
+    if meridiem == "am" and hour == 12:
+        return 0
+    return hour
+
+
+def _intent_working_hours(match):
+    """(start, end) hours from a '10am-6pm' / '10:00 to 18:00' match; None for bare '3-4' ranges"""
+    start, start_minutes, start_meridiem, end, end_minutes, end_meridiem = match.groups()
+    if not (start_meridiem or end_meridiem or start_minutes or end_minutes):
+        return None  # Too ambiguous in a free-form request (could be a date like 25-03)
+    end_hour = _to_24_hour(int(end), end_meridiem)
+    start_hour = _to_24_hour(int(start), start_meridiem or end_meridiem)
+    if not start_meridiem and start_hour >= end_hour:
+        start_hour = _to_24_hour(int(start), "am")  # "9-5pm" means 9 AM
+    if 0 <= start_hour < end_hour <= 23:
+        return start_hour, end_hour
+    return None
+
+
+def extract_intent(text, today=None):
+    """Every scheduling detail a free-form message mentions, found in one pass.
+
+    Returns a dict with ``emails`` (in order of appearance), ``working_hours``,
+    ``duration``, ``date_range``, ``date`` and the ``date_text`` they came
+    from; details that aren't mentioned are None. Only unambiguous forms are
+    accepted here (hours with am/pm or minutes, durations with a unit); the
+    step-by-step parsers stay more lenient.
+    """
+    emails = extract_emails(text)
+    remainder = EMAIL_PATTERN.sub(" ", text.lower())
+
+    working_hours = None
+    for match in _INTENT_HOURS_PATTERN.finditer(remainder):
+        working_hours = _intent_working_hours(match)
+        if working_hours:
+            remainder = remainder[:match.start()] + " " + remainder[match.end():]
+            break
+
+    duration = 0
+    for match in _INTENT_DURATION_PATTERN.finditer(remainder):
+        amount = int(match.group(1))
+        duration += amount * 60 if match.group(2).startswith("h") else amount
+    remainder = _INTENT_DURATION_PATTERN.sub(" ", remainder)
+    remainder = _INTENT_CLOCK_PATTERN.sub(" ", remainder)  # "at 3pm" is a time of day, not a date
+
+    words = [word for word in _INTENT_WORD_SPLIT.split(remainder) if word and word not in _INTENT_FILLER]
+    date_text = " ".join(words).strip(" .")
+    date_range = single_date = None
+    if date_text and _DATE_HINT.search(date_text):
+        date_range = extract_date_range(date_text, today)
+        if date_range is None:
+            single_date = _weekday_date(date_text, today) or extract_date(date_text)
+
+    return {
+        "emails": emails,
+        "working_hours": working_hours,
+        "duration": duration or None,
+        "date_range": date_range,
+        "date": single_date,
+        "date_text": date_text if (date_range or single_date) else None,
+    }
+
+
+# 📌 Batches and benchmark
+def parse_batch(texts, parser=None):
+    """Run one parser (``extract_date`` by default) over many inputs, parsing each distinct input once"""
+    parser = parser or extract_date
+    results = {}
+    for text in texts:
+        key = _normalize(text)
+        if key not in results:
+            results[key] = parser(key)
+    return [results[_normalize(text)] for text in texts]
+
+
+BENCHMARK_INPUTS = {
+    "date": ["tomorrow", "next Monday", "March 25th", "in 3 days", "25/03/2027", "friday"],
+    "duration": ["1 hour", "30 minutes", "45 min", "1 hr 30 min", "90"],
+    "working_hours": ["9 AM to 5 PM", "10:00 to 18:00", "9-5pm", "8am - 4pm"],
+}
+
+
+def _per_call_microseconds(function, inputs, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            function(text)
+    return (time.perf_counter() - started) / (rounds * len(inputs)) * 1e6
+
+
+def benchmark(rounds=50):
+    """Per-call latency of each parser: unrestricted dateparser / uncached, first call, memoized"""
+    dateparser = resources.timed_import("dateparser")
+    resources.get_date_parser()  # Pre-warm, as at server start
+    uncached = {
+        "date": lambda text: dateparser.parse(text, settings={"PREFER_DATES_FROM": "future"}),
+        "duration": lambda text: _duration.__wrapped__(_normalize(text)),
+        "working_hours": lambda text: _working_hours.__wrapped__(_normalize(text)),
+    }
+    parsers = {"date": extract_date, "duration": extract_duration, "working_hours": extract_working_hours}
+    results = []
+    for name, inputs in BENCHMARK_INPUTS.items():
+        before = _per_call_microseconds(uncached[name], inputs, rounds)
+        for cached in (_parse_date, _duration, _working_hours):
+            cached.cache_clear()
+        first = _per_call_microseconds(parsers[name], inputs, 1)
+        memoized = _per_call_microseconds(parsers[name], inputs, rounds)
+        results.append({"parser": name, "before_us": before, "first_call_us": first, "memoized_us": memoized})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-call latency of the natural-language parsers")
+    parser.add_argument("--rounds", type=int, default=50, help="calls per input")
+    args = parser.parse_args()
+
+    for result in benchmark(args.rounds):
+        print(
+            f"⏱️ {result['parser']:<13} before {result['before_us']:9.1f} µs, "
+            f"first call {result['first_call_us']:9.1f} µs, memoized {result['memoized_us']:6.2f} µs"
+        )
@@ -0,0 +1,96 @@
+"""Speculative availability prefetch.
+
+As soon as both emails are known, the freebusy data for the next few working
+days is fetched on a background thread into the shared freebusy cache. By the
+time the user has answered the duration question, ``get_free_slots`` for any
+of those days is usually a cache hit.
+
+Prefetches are speculative: a bounded number run at once (others are simply
+skipped), each session owns at most one, and it can be cancelled at any time.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta, timezone
+
+from availability import day_window
+from freebusy_cache import cached_freebusy_query
+
+PREFETCH_DAYS = int(os.environ.get("SCHEDULAI_PREFETCH_DAYS", "5"))
+PREFETCH_MAX_IN_FLIGHT = int(os.environ.get("SCHEDULAI_PREFETCH_MAX_IN_FLIGHT", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_IN_FLIGHT, thread_name_prefix="prefetch")
+_in_flight = threading.BoundedSemaphore(PREFETCH_MAX_IN_FLIGHT)
+
+
+def next_working_days(count, start=None):
+    """The next ``count`` weekdays, starting today"""
+    current = start or date.today()
+    days = []
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+class AvailabilityPrefetch:
+    """One session's background freebusy fetch for the next working days"""
+
+    def __init__(self, users, working_hours=None, days=PREFETCH_DAYS, start=None):
+        self.users = tuple(users)
+        self.working_hours = working_hours
+        working_days = next_working_days(days, start)
+        self.window_start = day_window(working_days[0], working_hours)[0]
+        self.window_end = day_window(working_days[-1], working_hours)[1]
+        self._cancelled = threading.Event()
+        self._future = None
+
+    def start(self, service_factory):
+        """Submit the fetch; returns False when too many prefetches are already running"""
+        if not _in_flight.acquire(blocking=False):
+            return False
+        try:
+            self._future = _executor.submit(self._run, service_factory)
+        except RuntimeError:
+            _in_flight.release()
+            return False
+        # Released on completion or cancellation, whichever comes first
+        self._future.add_done_callback(lambda _: _in_flight.release())
+        return True
+
+    def _run(self, service_factory):
+        try:
+            if self._cancelled.is_set():
+                return
+            body = {
+                "timeMin": self.window_start.astimezone(timezone.utc).isoformat(),
+                "timeMax": self.window_end.astimezone(timezone.utc).isoformat(),
+                "items": [{"id": email} for email in self.users],
+            }
+            cached_freebusy_query(service_factory(), body)
+        except Exception as e:
+            print(f"⚠️ Availability prefetch failed: {e}")
+
+    def covers(self, users, window_start, window_end):
+        """True if this prefetch fetched (or is fetching) the given users and window"""
+        return (
+            not self._cancelled.is_set()
+            and set(users) <= set(self.users)
+            and self.window_start <= window_start
+            and window_end <= self.window_end
+        )
+
+    def wait(self, timeout=None):
+        """Block until the fetch finishes so the caller can read it from the cache"""
+        if self._future is None or self._cancelled.is_set():
+            return
+        try:
+            self._future.result(timeout=timeout)
+        except Exception:
+            pass
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
@@ -0,0 +1,223 @@
+"""Process-wide resources shared by every Streamlit session.
+
+Streamlit re-executes Bot.py from the top on every message and button click,
+but modules imported by it stay in ``sys.modules``. Anything built through the
+registry below is therefore created once per server process and reused by all
+sessions and reruns.
+
+Heavy dependencies are imported lazily through ``timed_import`` so the chat UI
+renders before spaCy, Gemini or the Google client libraries are loaded. Run
+``python resources.py`` for an import-time report.
+"""
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# 📌 Configuration
+SERVICE_ACCOUNT_FILE = "credentials.json"
+SCOPES = ["https://www.googleapis.com/auth/calendar"]  # Full access to manage calendars
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+SPACY_MODEL_NAME = "en_core_web_sm"
+# Languages dateparser considers; detecting the language of every input is most of its cost
+DATE_LANGUAGES = os.environ.get("SCHEDULAI_DATE_LANGUAGES", "en").split(",")
+
+# Modules that are only imported when the step needing them first runs
+HEAVY_MODULES = [
+    "spacy",
+    "en_core_web_sm",
+    "dateparser",
+    "googleapiclient.discovery",
+    "google.oauth2.service_account",
+    "google.generativeai",
+]
+
+_import_timings = {}
+
+
+def timed_import(name):
+    """Import a module on first use and record how long the import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_timings.setdefault(name, time.perf_counter() - started)
+    return module
+
+
+def import_timings():
+    """Import time in seconds for every module loaded through ``timed_import``."""
+    return dict(_import_timings)
+
+
+class ResourceRegistry:
+    """Lazily builds named resources once and remembers how long each took."""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._timings = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        """Register a zero-argument factory under ``name``."""
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """Return the resource, building it on first use."""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown resource: {name}")
+
+        # One lock per resource so a slow model load doesn't block the others
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                instance = self._factories[name]()
+                elapsed = time.perf_counter() - started
+                self._timings[name] = elapsed
+                self._instances[name] = instance
+                print(f"⏱️ Initialized {name} in {elapsed * 1000:.1f} ms")
+        return self._instances[name]
+
+    def is_ready(self, name):
+        return name in self._instances
+
+    def warm(self, names=None, background=False):
+        """Build the given resources (all by default) ahead of the first request."""
+        names = list(names or self._factories)
+
+        def _warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"❌ Failed to warm {name}: {e}")
+
+        if background:
+            thread = threading.Thread(target=_warm, name="resource-warmup", daemon=True)
+            thread.start()
+            return thread
+        _warm()
+        return None
+
+    def timings(self):
+        """Initialization time in seconds for every resource built so far."""
+        return dict(self._timings)
+
+    def reset(self, name=None):
+        """Drop cached instances so they are rebuilt on next use."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._timings.clear()
+            else:
+                self._instances.pop(name, None)
+                self._timings.pop(name, None)
+
+
+def _build_calendar_service():
+    service_account = timed_import("google.oauth2.service_account")
+    timed_import("googleapiclient.discovery")
+    import calendar_discovery
+
+    from http_pool import HttpPool
+
+    credentials = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+    # Built from the cached discovery document, so no network round trip on cold start.
+    # Requests go through a pool of authorized clients since httplib2 isn't thread-safe.
+    return calendar_discovery.build_calendar_service(http=HttpPool(credentials))
+
+
+def _build_gemini_model():
+    genai = timed_import("google.generativeai")
+    genai.configure(api_key=os.environ.get("GEMINI_API_KEY", ""))
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
+
+
+def _load_spacy_model():
+    timed_import("spacy")
+    try:
+        return timed_import(SPACY_MODEL_NAME).load()
+    except (ImportError, OSError):
+        print("Installing required language model...")
+        subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL_NAME])
+        return importlib.import_module("spacy").load(SPACY_MODEL_NAME)
+
+
+def build_date_parser(relative_base=None):
+    """A reusable dateparser restricted to DATE_LANGUAGES, preferring future dates"""
+    dateparser = timed_import("dateparser")
+    settings = {"PREFER_DATES_FROM": "future"}
+    if relative_base is not None:
+        settings["RELATIVE_BASE"] = relative_base
+    parser = dateparser.DateDataParser(languages=DATE_LANGUAGES, settings=settings)
+    parser.get_date_data("tomorrow")  # Loads the locale data and compiles its patterns up front
+    return parser
+
+
+registry = ResourceRegistry()
+registry.register("calendar", _build_calendar_service)
+registry.register("gemini", _build_gemini_model)
+registry.register("spacy", _load_spacy_model)
+registry.register("dateparser", build_date_parser)
+
+
+def get_calendar_service():
+    return registry.get("calendar")
+
+
+def get_model():
+    return registry.get("gemini")
+
+
+def get_nlp():
+    return registry.get("spacy")
+
+
+def get_date_parser():
+    return registry.get("dateparser")
+
+
+_warmup_started = threading.Event()
+
+
+def warm_up(background=True):
+    """Warm every shared resource once per process, by default on a background thread."""
+    if _warmup_started.is_set():
+        return None
+    _warmup_started.set()
+    return registry.warm(background=background)
+
+
+def measure_cold_imports(modules=HEAVY_MODULES):
+    """Import each module in a fresh interpreter and return its cold import time."""
+    results = {}
+    for name in modules:
+        code = (
+            "import time; started = time.perf_counter(); "
+            f"import {name}; print(time.perf_counter() - started)"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if completed.returncode == 0:
+            results[name] = float(completed.stdout.strip().splitlines()[-1])
+        else:
+            results[name] = None
+    return results
+
+
+if __name__ == "__main__":
+    print("📦 Cold import times")
+    for name, seconds in measure_cold_imports().items():
+        timing = "not installed" if seconds is None else f"{seconds * 1000:.1f} ms"
+        print(f"  {name:<32} {timing}")
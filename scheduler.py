@@ -0,0 +1,763 @@
+"""Headless scheduling engine: the chat state machine without Streamlit.
+
+All conversation state lives on an explicit session object, either a
+``SchedulingSession`` or anything with the same attributes (the Streamlit app
+passes ``st.session_state``). Steps run in order:
+
+    initial → working_hours → candidate_email → interview_duration
+      → interview_date → select_slot → confirm_scheduling → scheduling → done
+
+Warnings and errors that the UI should show go through a ``notify(level,
+message)`` callback, so the same engine drives the Streamlit app, the CLI
+below and the HTTP API in scheduler_api.py.
+
+    python scheduler.py            # chat in the terminal
+    python scheduler.py serve      # HTTP API (see scheduler_api.py)
+
+Picking a slot holds it (holds.py) until the session confirms, changes the
+date or the hold expires, so concurrent sessions never offer the same slot.
+The slot is also re-checked against a fresh freebusy query when it is held and
+again on confirm, since a list shown earlier may predate someone else's booking.
+"""
+import argparse
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import resources
+from availability import (
+    busy_from_freebusy,
+    compute_availability,
+    compute_range_availability,
+    day_window,
+    day_windows,
+)
+from calendar_api import classify_error, execute
+from calendar_sync import SYNC_ENABLED, calendar_sync
+from confirm_pipeline import submit_confirmation
+from freebusy_cache import FREEBUSY_TTL_SECONDS, cached_freebusy_query, freebusy_cache
+from holds import hold_store
+from parsers import (
+    extract_date,
+    extract_date_range,
+    extract_duration,
+    extract_emails,
+    extract_intent,
+    extract_working_hours,
+)
+from prefetch import AvailabilityPrefetch
+
+RANGE_SLOT_LIMIT = 10  # Slots offered when searching a date range
+RANGE_ORDER = os.environ.get("SCHEDULAI_RANGE_ORDER", "earliest")  # Or "best"; saying "best" asks for it too
+PREFETCH_WAIT_SECONDS = 10  # How long to wait for an in-flight prefetch before querying directly
+CONFIRM_POLL_SECONDS = 0.2
+SLOT_PAGE_SIZE = int(os.environ.get("SCHEDULAI_SLOT_PAGE_SIZE", "10"))  # Slots listed per reply
+
+
+@dataclass
+class SchedulingSession:
+    """Everything one scheduling conversation needs between messages"""
+    step: str = "initial"
+    user_email: Optional[str] = None
+    candidate_email: Optional[str] = None
+    interview_date: Any = None
+    pending_date: Optional[str] = None  # Date text given before the intake questions were all answered
+    range_search: bool = False  # free_slots span several days
+    interview_duration: Optional[int] = None
+    free_slots: Any = field(default_factory=list)  # Usually a compact SlotList
+    slot_page: int = 0
+    selected_slot: Optional[dict] = None
+    working_hours: Optional[tuple] = None
+    confirmation_state: Any = None  # {"event_id": ...} once the selected slot has been confirmed
+    modification_type: Any = None
+    previous_step: Optional[str] = None
+    prefetch: Any = None  # Background availability fetch for this session
+    hold: Any = None  # Reservation on the selected slot
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def snapshot(self):
+        """JSON-friendly view of the session for APIs and logs"""
+        return {
+            "session_id": self.session_id,
+            "step": self.step,
+            "user_email": self.user_email,
+            "candidate_email": self.candidate_email,
+            "working_hours": list(self.working_hours) if self.working_hours else None,
+            "interview_duration": self.interview_duration,
+            "interview_date": self.interview_date.isoformat() if self.interview_date else None,
+            "free_slots": [_slot_json(slot) for slot in _page(self)],  # The page the last reply listed
+            "free_slot_count": len(self.free_slots),
+            "slot_page": self.slot_page,
+            "selected_slot": _slot_json(self.selected_slot) if self.selected_slot else None,
+        }
+
+
+def _slot_json(slot):
+    return {"start": slot["start"].isoformat(), "end": slot["end"].isoformat()}
+
+
+def _ignore(level, message):
+    pass
+
+
+def _page(session):
+    first = session.slot_page * SLOT_PAGE_SIZE
+    return session.free_slots[first:first + SLOT_PAGE_SIZE]
+
+
+# 📌 Availability
+def start_availability_prefetch(session):
+    """Speculatively fetch the next working days' availability once both emails are known"""
+    cancel_availability_prefetch(session)
+    users = [session.user_email, session.candidate_email]
+    if all(users):
+        prefetch = AvailabilityPrefetch(users, session.working_hours)
+        if prefetch.start(resources.get_calendar_service):
+            session.prefetch = prefetch
+
+
+def cancel_availability_prefetch(session):
+    prefetch = getattr(session, "prefetch", None)
+    if prefetch is not None:
+        prefetch.cancel()
+    session.prefetch = None
+
+
+def fetch_busy_slots(users, window_start, window_end, session=None, notify=_ignore):
+    """Busy slots per user in IST: synced calendars from the local index, the rest in one freebusy query.
+
+    Slots other sessions are holding count as busy too.
+    """
+    busy_by_attendee = _calendar_busy_slots(users, window_start, window_end, session, notify)
+    owner = getattr(session, "session_id", None)
+    for email in users:
+        held = hold_store.held_intervals(email, window_start, window_end, exclude_owner=owner)
+        if held:
+            busy_by_attendee[email] = list(busy_by_attendee.get(email, [])) + held
+    return busy_by_attendee
+
+
+def _calendar_busy_slots(users, window_start, window_end, session, notify):
+    busy_by_attendee = {}
+    remaining = []
+    for email in users:
+        busy = calendar_sync.busy(email, window_start, window_end)  # None unless the calendar is indexed
+        if busy is None:
+            remaining.append(email)
+        else:
+            busy_by_attendee[email] = busy
+    if not remaining:
+        return busy_by_attendee
+
+    # Let a running prefetch for this window land in the cache instead of querying twice
+    prefetch = getattr(session, "prefetch", None)
+    if prefetch is not None and prefetch.covers(remaining, window_start, window_end):
+        prefetch.wait(timeout=PREFETCH_WAIT_SECONDS)
+
+    request_body = {
+        "timeMin": window_start.astimezone(timezone.utc).isoformat(),
+        "timeMax": window_end.astimezone(timezone.utc).isoformat(),
+        "items": [{"id": email} for email in remaining]
+    }
+    # Served from the shared freebusy cache when a covering window is still fresh
+    response = cached_freebusy_query(resources.get_calendar_service(), request_body)
+    calendars = response.get("calendars", {})
+
+    # Busy slots per attendee in IST; unreadable calendars count as busy throughout
+    freebusy_busy, inaccessible = busy_from_freebusy(calendars, window_start, window_end)
+    for user in inaccessible:
+        notify("warning", f"⚠️ Cannot access calendar for {user}")
+    busy_by_attendee.update(freebusy_busy)
+    return busy_by_attendee
+
+
+def notify_calendar_fetch_error(error, notify):
+    if classify_error(error) in ("rate_limit", "quota"):
+        notify("warning", "Google Calendar is limiting requests right now. Please try again in a minute.")
+    else:
+        notify("error", f"Error fetching calendar data: {str(error)}")
+
+
+def get_free_slots(users, date, duration_minutes, working_hours=None, optional_users=None, quorum=0,
+                   session=None, notify=_ignore):
+    """Find interview slots on ``date`` for any number of attendees.
+
+    Everyone in ``users`` must be free; ``optional_users`` only count toward
+    ``quorum`` (e.g. at least 2 of 4 panel interviewers free).
+    """
+    optional_users = list(optional_users or [])
+
+    # Set the day boundaries in IST directly
+    start_time_ist, end_time_ist = day_window(date, working_hours)
+
+    try:
+        busy_by_attendee = fetch_busy_slots(users + optional_users, start_time_ist, end_time_ist, session, notify)
+
+        # One sweep over every attendee's busy slots, then split into interview slots
+        return compute_availability(
+            busy_by_attendee, start_time_ist, end_time_ist, duration_minutes,
+            working_hours=working_hours, required=users, optional=optional_users, quorum=quorum,
+        )
+
+    except Exception as e:
+        notify_calendar_fetch_error(e, notify)
+        return {"common_free_slots": [], "split_slots": []}
+
+
+def get_free_slots_range(users, start_date, end_date, duration_minutes, working_hours=None,
+                         optional_users=None, quorum=0, limit=RANGE_SLOT_LIMIT, order="earliest",
+                         session=None, notify=_ignore):
+    """Find the earliest (or best) ``limit`` slots across working days in a date range.
+
+    The whole range is fetched with a single freebusy query and split per day locally.
+    """
+    optional_users = list(optional_users or [])
+    windows = day_windows(start_date, end_date, working_hours)
+    if not windows:
+        return {"common_free_slots": [], "split_slots": []}
+
+    try:
+        busy_by_attendee = fetch_busy_slots(users + optional_users, windows[0][0], windows[-1][1], session, notify)
+        return compute_range_availability(
+            busy_by_attendee, windows, duration_minutes, working_hours=working_hours,
+            required=users, optional=optional_users, quorum=quorum, limit=limit, order=order,
+        )
+
+    except Exception as e:
+        notify_calendar_fetch_error(e, notify)
+        return {"common_free_slots": [], "split_slots": []}
+
+
+# 📌 Slot holds
+SLOT_TAKEN_REPLY = "⚠️ This slot has just been reserved or booked elsewhere. Please **select a different slot** or try another date."
+
+
+def slot_is_free(session, slot):
+    """Re-check ``slot`` with a fresh freebusy query, bypassing the cache and the sync index.
+
+    Fails open when the query itself fails; the hold still guards against other sessions.
+    """
+    users = [session.user_email, session.candidate_email]
+    request_body = {
+        "timeMin": slot["start"].astimezone(timezone.utc).isoformat(),
+        "timeMax": slot["end"].astimezone(timezone.utc).isoformat(),
+        "items": [{"id": email} for email in users]
+    }
+    try:
+        service = resources.get_calendar_service()
+        response = execute(service.freebusy().query(body=request_body), calendar_ids=users)
+    except Exception:
+        return True
+    busy_by_attendee, _ = busy_from_freebusy(response.get("calendars", {}))
+    return not any(
+        busy["start"] < slot["end"] and slot["start"] < busy["end"]
+        for busy_slots in busy_by_attendee.values() for busy in busy_slots
+    )
+
+
+def _still_free(session, slot):
+    if slot_is_free(session, slot):
+        return True
+    release_hold(session)
+    for email in (session.user_email, session.candidate_email):
+        freebusy_cache.invalidate(email)  # The next search must not offer the booked slot again
+        calendar_sync.mark_stale(email)
+    return False
+
+
+def hold_slot(session, slot):
+    """Reserve ``slot`` on both calendars for this session.
+
+    False if another session holds it or the calendars show it booked since the list was fetched.
+    """
+    release_hold(session)
+    session.hold = hold_store.acquire(
+        session.session_id, [session.user_email, session.candidate_email], slot["start"], slot["end"]
+    )
+    return session.hold is not None and _still_free(session, slot)
+
+
+def release_hold(session):
+    hold = getattr(session, "hold", None)
+    if hold is not None:
+        hold_store.release(hold)
+    session.hold = None
+
+
+def keep_booked_hold(session):
+    """Hand the hold over to the booked event until every worker's freebusy cache has seen it"""
+    hold = getattr(session, "hold", None)
+    if hold is not None:
+        hold_store.extend(hold, FREEBUSY_TTL_SECONDS)
+    session.hold = None
+
+
+def _ensure_hold(session):
+    """Keep the selected slot reserved and free, re-taking the hold if it expired while the user decided"""
+    hold = getattr(session, "hold", None)
+    if hold is not None and hold_store.is_active(hold):
+        return _still_free(session, session.selected_slot)
+    return hold_slot(session, session.selected_slot)
+
+
+# 📌 Slot pages
+def slot_page_text(session):
+    """The current page of numbered slots, with how to reach the others"""
+    first = session.slot_page * SLOT_PAGE_SIZE
+    page = _page(session)
+    # Range searches have no single interview date, so show the day with each slot
+    day = "%a %d %b, " if session.range_search else ""
+    lines = [
+        f"{first + i + 1}. {slot['start'].strftime(day + '%H:%M')} to {slot['end'].strftime('%H:%M')}"
+        for i, slot in enumerate(page)
+    ]
+    total = len(session.free_slots)
+    if total > len(page):
+        hints = []
+        if first + len(page) < total:
+            hints.append("**more** for later slots")
+        if first:
+            hints.append("**back** for earlier ones")
+        lines.append(f"\nShowing {first + 1}-{first + len(page)} of {total}. Type {' or '.join(hints)}.")
+    return "\n".join(lines)
+
+
+def show_slots(session, pages=0):
+    """Move ``pages`` pages through the slot list and reply with that page"""
+    last_page = max(len(session.free_slots) - 1, 0) // SLOT_PAGE_SIZE
+    session.slot_page = min(max(session.slot_page + pages, 0), last_page)
+    return f"""{slot_page_text(session)}
+
+Please select an interview slot by entering its number (1-{len(session.free_slots)})."""
+
+
+# 📌 Conversation steps
+INTAKE_STEPS = ("initial", "working_hours", "candidate_email", "interview_duration")
+
+STEP_QUESTIONS = {
+    "initial": "Please provide the **Recruiter email**.",
+    "working_hours": "Please specify your preferred working hours (e.g., '9 AM to 5 PM' or '10:00 to 18:00').",
+    "candidate_email": "Now, please provide the **candidate's** email.",
+    "interview_duration": "How long should the interview be? (e.g., '1 hour', '30 minutes', '45 min', '1 hr 30 min')",
+    "interview_date": "What's your preferred interview date? You can use natural language like 'next Monday' or 'March 25th', or a range like 'next week'.",
+}
+
+
+def next_unanswered_step(session):
+    """First intake question without an answer yet, or "interview_date" once all are in"""
+    answers = {
+        "initial": session.user_email,
+        "working_hours": session.working_hours,
+        "candidate_email": session.candidate_email,
+        "interview_duration": session.interview_duration,
+    }
+    return next((step for step in INTAKE_STEPS if not answers[step]), "interview_date")
+
+
+def _ask_next(session, reply, notify):
+    """Move on to the next open question; once only the date is left, search a date given earlier"""
+    session.step = next_unanswered_step(session)
+    if session.step == "interview_date" and session.pending_date:
+        date_text, session.pending_date = session.pending_date, None
+        return reply + "\n\n" + process_user_input(session, date_text, notify)
+    return reply + "\n\n" + STEP_QUESTIONS[session.step]
+
+
+def _set_recruiter(session, email):
+    session.user_email = email
+    cancel_availability_prefetch(session)  # Any prefetch was for the previous recruiter
+    if SYNC_ENABLED:
+        calendar_sync.enroll_async(email)  # Answer later lookups from a local index
+
+
+def apply_intent(session, user_input, notify=_ignore):
+    """Take every detail a free-form message gives at once and skip the steps it answers.
+
+    Returns the reply, or None when the message answers at most one thing and
+    should go through the normal step-by-step parsing instead.
+    """
+    intent = extract_intent(user_input)
+    emails = list(intent["emails"])
+    recruiter = emails.pop(0) if session.step == "initial" and emails else None
+    candidate = next((email for email in emails if email != (recruiter or session.user_email)), None)
+    supplied = [recruiter, candidate, intent["working_hours"], intent["duration"], intent["date_text"]]
+    if sum(value is not None for value in supplied) < 2:
+        return None
+
+    summary = []
+    if recruiter:
+        _set_recruiter(session, recruiter)
+        summary.append(f"📧 Recruiter: {recruiter}")
+    if intent["working_hours"]:
+        session.working_hours = intent["working_hours"]
+        summary.append(f"🕘 Working hours: {session.working_hours[0]:02d}:00 to {session.working_hours[1]:02d}:00 IST")
+    if candidate:
+        session.candidate_email = candidate
+        summary.append(f"📧 Candidate: {candidate}")
+    if intent["duration"]:
+        session.interview_duration = intent["duration"]
+        summary.append(f"⏱️ Duration: {session.interview_duration} minutes")
+    if intent["date_text"]:
+        session.pending_date = intent["date_text"]  # Searched as soon as the last intake answer is in
+
+    session.step = next_unanswered_step(session)
+    if session.pending_date and session.step != "interview_date":
+        summary.append(f"📅 Date: {session.pending_date} (searched once the details below are in)")
+    reply = "✅ Got it:\n" + "\n".join(summary) if summary else "✅ Got it."
+
+    if session.candidate_email and session.step not in ("candidate_email", "interview_date"):
+        start_availability_prefetch(session)  # Runs while the user answers the remaining questions
+    return _ask_next(session, reply, notify)
+
+
+def process_user_input(session, user_input, notify=_ignore):
+    """Advance the conversation by one user message; returns the assistant's reply"""
+    if session.step in INTAKE_STEPS:
+        # "schedule a@x.com with b@y.com for 45 min next Tuesday" answers several steps at once
+        reply = apply_intent(session, user_input, notify)
+        if reply is not None:
+            return reply
+
+    if session.step == "initial":
+        # Extract emails from input
+        emails = extract_emails(user_input)
+        if emails:
+            _set_recruiter(session, emails[0])
+            if next_unanswered_step(session) == "working_hours":
+                session.step = "working_hours"
+                return "✅ Found your email. To help schedule interviews efficiently, please specify your preferred working hours (e.g., '9 AM to 5 PM' or '10:00 to 18:00')."
+            return _ask_next(session, "✅ Found your email.", notify)
+        return "I couldn't find a valid email address in your input. Please provide your email address."
+
+    elif session.step == "working_hours":
+        working_hours = extract_working_hours(user_input)
+        if working_hours:
+            session.working_hours = working_hours
+            return _ask_next(session, f"✅ Working hours set to {working_hours[0]:02d}:00 to {working_hours[1]:02d}:00 IST.", notify)
+        return "I couldn't understand the working hours format. Please specify like '9 AM to 5 PM' or '10:00 to 18:00'."
+
+    elif session.step == "candidate_email":
+        # Extract emails, excluding the recruiter's email
+        emails = [email for email in extract_emails(user_input)
+                  if email != session.user_email]
+        if emails:
+            session.candidate_email = emails[0]
+            start_availability_prefetch(session)  # Runs while the user answers the duration question
+            return _ask_next(session, f"✅ Found candidate's email: {emails[0]}", notify)
+        return "I couldn't find a valid email address for the candidate. Please provide the candidate's email."
+
+    elif session.step == "interview_duration":
+        duration_minutes = extract_duration(user_input)
+        if duration_minutes:
+            session.interview_duration = duration_minutes
+            return _ask_next(session, f"✅ Interview duration set to {duration_minutes} minutes.", notify)
+        return "I couldn't understand the duration. Please specify like '1 hour', '30 minutes', or '45 min', '1 hr 30 min'."
+
+    elif session.step == "interview_date":
+        users = [session.user_email, session.candidate_email]
+
+        # A range like "next week" or "any day before the 30th" is searched in one query
+        date_range = extract_date_range(user_input)
+        if date_range:
+            start_date, end_date = date_range
+            order = "best" if "best" in user_input.lower().split() else RANGE_ORDER
+            slots_result = get_free_slots_range(users, start_date, end_date, session.interview_duration,
+                                                working_hours=session.working_hours, order=order,
+                                                session=session, notify=notify)
+
+            range_text = f"{start_date.strftime('%A, %B %d')} and {end_date.strftime('%A, %B %d, %Y')}"
+            if slots_result["split_slots"]:
+                session.free_slots = slots_result["split_slots"]
+                session.interview_date = None  # Slots can fall on different days
+                session.range_search = True
+                session.slot_page = 0
+
+                session.step = "select_slot"
+                return f"""✅ {'Best-fitting' if order == 'best' else 'Earliest'} {session.interview_duration}-minute interview slots between {range_text} (IST):
+
+{show_slots(session)}"""
+            return f"**No common free slots** found on working days between {range_text} with duration of **{session.interview_duration} minutes**. Please try **another date or range**."
+
+        # Extract date using NLP
+        extracted_date = extract_date(user_input)
+        if extracted_date:
+            if extracted_date < datetime.now().date():
+                return "The date you provided is in the past. Please provide a future date."
+
+            session.interview_date = extracted_date
+            slots_result = get_free_slots(users, extracted_date, session.interview_duration,
+                                          working_hours=session.working_hours, session=session, notify=notify)
+
+            if slots_result["split_slots"]:
+                session.free_slots = slots_result["split_slots"]  # Store split slots for selection
+                session.range_search = False
+                session.slot_page = 0
+
+                # Format common free time blocks with full date-time for clarity
+                common_slots_text = "\n".join([
+                    f"📆 {slot['start'].strftime('%H:%M')} to {slot['end'].strftime('%H:%M')}"
+                    for slot in slots_result["common_free_slots"]
+                ])
+
+                session.step = "select_slot"
+                return f"""✅ Available time slots for {extracted_date.strftime('%A, %B %d, %Y')}:
+
+Common Free Time Blocks (IST):
+{common_slots_text}
+
+Available {session.interview_duration}-minute Interview Slots (Select from these numbered slots):
+{show_slots(session)}"""
+            return f"**No common free slots** found for {extracted_date.strftime('%A, %B %d')} with duration of **{session.interview_duration} minutes**. Please try **another date**."
+        return "I couldn't understand the date. Please provide a date like **'next Monday' or 'March 25th'**."
+
+    elif session.step == "select_slot":
+        command = user_input.strip().lower()
+        if command in ("more", "next"):
+            return show_slots(session, 1)
+        if command in ("back", "previous"):
+            return show_slots(session, -1)
+        try:
+            slot_index = int(user_input) - 1
+            if 0 <= slot_index < len(session.free_slots):
+                selected_slot = session.free_slots[slot_index]
+                if not hold_slot(session, selected_slot):
+                    return SLOT_TAKEN_REPLY
+                session.selected_slot = selected_slot
+                session.confirmation_state = None  # A new slot gets a new event id
+                session.interview_date = selected_slot["start"].date()  # Range searches span several days
+                session.step = "confirm_scheduling"
+
+                # Generate confirmation message
+                confirmation = f"""
+🎯 Please confirm the interview details:
+
+📧 Recruiter: {session.user_email}
+📧 Candidate: {session.candidate_email}
+📅 Date: {session.interview_date.strftime('%A, %B %d, %Y')}
+⏰ Time: {selected_slot['start'].strftime('%H:%M')} to {selected_slot['end'].strftime('%H:%M')}
+⏱️ Duration: {session.interview_duration} minutes
+
+Would you like to proceed with scheduling this interview?
+"""
+                return confirmation
+            return "**Invalid slot number**. Please select a **valid number** from the list."
+        except ValueError:
+            return "Please enter a **valid number** to select a time slot."
+
+    elif session.step == "modification_choice":
+        if user_input.lower() == "recruiter email":
+            session.previous_step = session.step
+            return modify_recruiter(session)
+        elif user_input.lower() == "candidate email":
+            session.previous_step = session.step
+            return modify_candidate(session)
+        else:
+            session.step = "interview_date"
+            return "What's your preferred interview date? You can use natural language like **'next Monday' or 'March 25th'**."
+
+    return "***I don't understand. Please follow the instructions.***"
+
+
+def change_date(session):
+    release_hold(session)
+    session.step = "interview_date"
+    session.interview_date = None
+    session.selected_slot = None
+    session.confirmation_state = None
+    return "Please provide a new preferred interview date. You can use natural language like 'next Monday' or 'March 25th'."
+
+
+def modify_details(session):
+    session.step = "modification_choice"
+
+
+def modify_recruiter(session):
+    release_hold(session)
+    session.step = "initial"
+    session.user_email = None
+    return "Please provide the new recruiter email."
+
+
+def modify_candidate(session):
+    release_hold(session)
+    session.step = "candidate_email"
+    session.candidate_email = None
+    return "Please provide the new candidate email."
+
+
+def reset(session):
+    """Start a new conversation on the same session object"""
+    cancel_availability_prefetch(session)
+    release_hold(session)
+    session.step = "initial"
+    session.user_email = None
+    session.candidate_email = None
+    session.interview_date = None
+    session.pending_date = None
+    session.range_search = False
+    session.interview_duration = None
+    session.free_slots = []
+    session.slot_page = 0
+    session.selected_slot = None
+    session.confirmation_state = None
+    session.modification_type = None
+    session.previous_step = None
+
+
+# 📌 Confirmation
+def confirm(session):
+    """Start inserting the selected slot and drafting the email; returns the ``ConfirmationJob``.
+
+    Returns None, and sends the session back to slot selection, if another
+    session has reserved the slot since or the calendars now show it booked.
+    """
+    if not _ensure_hold(session):
+        session.selected_slot = None
+        session.step = "select_slot"
+        return None
+    if not session.confirmation_state:
+        # Kept across retries of this slot, so an insert that landed despite an error isn't repeated
+        session.confirmation_state = {"event_id": uuid.uuid4().hex}
+    return _submit(session)
+
+
+def resume_confirmation(session):
+    """Pick up a session saved in "scheduling" (after a reload, a restart or on another worker).
+
+    The insert is sent again with the saved event id, so if it already landed
+    the existing event is returned rather than a duplicate. Sessions without
+    an id go through ``confirm``.
+    """
+    if not (session.confirmation_state or {}).get("event_id"):
+        session.step = "confirm_scheduling"
+        return confirm(session)
+    return _submit(session)
+
+
+def _submit(session):
+    job = submit_confirmation(
+        session.user_email,
+        session.candidate_email,
+        session.selected_slot,
+        session.interview_duration,
+        session.confirmation_state["event_id"]
+    )
+    session.step = "scheduling"
+    return job
+
+
+def calendar_error_message(error, recruiter_email):
+    """Explain a failed calendar insert: quota trouble or the sharing setup"""
+    error_message = str(error)
+    kind = classify_error(error)
+    if kind in ("rate_limit", "quota"):
+        hint = "Google Calendar is limiting requests right now. Your calendar setup is fine; please try again in a minute."
+    elif kind == "permission" or (kind == "other" and "403" in error_message):
+        hint = f"""Calendar access error. Please check:
+1. You've shared your calendar ({recruiter_email}) with: calendar-scheduler-bot@scheduling-bot-453903.iam.gserviceaccount.com
+2. The service account has "Make changes and manage sharing" permissions
+3. Try removing and re-adding the sharing permissions"""
+    elif kind == "not_found" or (kind == "other" and "404" in error_message):
+        hint = f"""Calendar not found error. This means:
+1. The service account cannot access the calendar for {recruiter_email}
+2. Please make sure you've shared your calendar with the service account email"""
+    else:
+        hint = "Please make sure you've shared your calendar with the service account email: calendar-scheduler-bot@scheduling-bot-453903.iam.gserviceaccount.com"
+    return f"❌ Error creating calendar event: {error_message}\n\n{hint}"
+
+
+def finish_confirmation(session, job):
+    """Reply for a finished ``ConfirmationJob``; moves the session to "done" or back to confirming"""
+    if job.event_error is not None:
+        session.step = "confirm_scheduling"
+        return calendar_error_message(job.event_error, job.recruiter_email)
+
+    slot = job.slot
+    html_link = job.event_result.get('htmlLink', '')
+    keep_booked_hold(session)  # Other workers may still serve freebusy from before the insert
+    session.step = "done"
+    return f"""✅ Interview has been scheduled successfully!
+
+Event Details:
+- Date: {slot['start'].strftime('%A, %B %d, %Y')}
+- Time: {slot['start'].strftime('%H:%M')} to {slot['end'].strftime('%H:%M')} IST
+- Duration: {job.duration_minutes} minutes
+- Recruiter: {job.recruiter_email}
+- Candidate: {job.candidate_email}
+- Customize and share manually: [Google Calendar Event]({html_link})
+
+You can share the calendar event with the candidate using this link: [Send it]({job.email_link})
+
+### :green[**The event has been added to your calendar.**]"""
+
+
+def confirm_and_wait(session, poll_seconds=CONFIRM_POLL_SECONDS):
+    """Blocking confirmation for callers without a UI loop; returns ``(reply, job)``"""
+    job = confirm(session)
+    if job is None:
+        return SLOT_TAKEN_REPLY, None
+    while not job.finished:
+        time.sleep(poll_seconds)
+    return finish_confirmation(session, job), job
+
+
+# 📌 Command line
+CLI_INTRO = "SchedulAI - type your answers, 'reset' to start over or 'quit' to exit.\nPlease provide the recruiter email to get started."
+
+
+def run_cli():
+    session = SchedulingSession()
+
+    def notify(level, message):
+        print(f"[{level}] {message}")
+
+    print(CLI_INTRO)
+    while True:
+        try:
+            text = input("> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if text.lower() in ("quit", "exit"):
+            break
+        if text.lower() == "reset":
+            reset(session)
+            print("Please provide the recruiter email to get started.")
+            continue
+
+        if session.step == "confirm_scheduling":
+            choice = text.lower()
+            if choice in ("y", "yes", "confirm"):
+                reply, _ = confirm_and_wait(session)
+            elif choice in ("change", "change date"):
+                reply = change_date(session)
+            elif choice in ("modify", "modify details"):
+                modify_details(session)
+                reply = "What would you like to modify? (recruiter email / candidate email / date)"
+            else:
+                reply = "Type 'yes' to schedule, 'change' for another date/time or 'modify' to edit details."
+        else:
+            reply = process_user_input(session, text, notify)
+            if session.step == "confirm_scheduling":
+                reply += "\nType 'yes' to schedule, 'change' for another date/time or 'modify' to edit details."
+        print(reply)
+    cancel_availability_prefetch(session)
+    release_hold(session)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SchedulAI without the Streamlit UI")
+    subcommands = parser.add_subparsers(dest="command")
+    serve = subcommands.add_parser("serve", help="run the HTTP API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        import scheduler_api
+
+        scheduler_api.serve(args.host, args.port)
+    else:
+        run_cli()
@@ -0,0 +1,211 @@
+"""Async JSON HTTP API over the headless scheduling engine (scheduler.py).
+
+Built on asyncio streams from the standard library, so a single process can
+hold many sessions without Streamlit's per-rerun overhead. Engine calls that
+block (Calendar, Gemini) run on a thread pool; requests for the same session
+are handled one at a time.
+
+    POST   /sessions                     -> new session
+    GET    /sessions/{id}                -> session state
+    POST   /sessions/{id}/messages       {"text": "..."} -> reply
+    POST   /sessions/{id}/confirm        -> schedule the selected slot
+    POST   /sessions/{id}/change-date
+    POST   /sessions/{id}/reset
+    DELETE /sessions/{id}
+
+Sessions idle for ``SCHEDULAI_API_SESSION_TTL`` seconds are dropped from
+memory. Every change is also saved to the session store (session_store.py), so
+with ``SCHEDULAI_SESSIONS_DB`` set a session can continue on any API process.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import scheduler
+import session_store
+
+API_WORKERS = int(os.environ.get("SCHEDULAI_API_WORKERS", "16"))
+SESSION_TTL_SECONDS = float(os.environ.get("SCHEDULAI_API_SESSION_TTL", "3600"))
+MAX_BODY_BYTES = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SchedulerAPI:
+    """Routes JSON requests to scheduler functions on per-session state"""
+
+    def __init__(self, workers=API_WORKERS, session_ttl=SESSION_TTL_SECONDS, clock=time.monotonic, store=None):
+        self._store = store or session_store.session_store
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler-api")
+        self.session_ttl = session_ttl
+        self._clock = clock
+        self._sessions = {}  # id -> (session, asyncio.Lock, last_used)
+
+    def _evict_idle(self):
+        cutoff = self._clock() - self.session_ttl
+        for session_id, (session, _, last_used) in list(self._sessions.items()):
+            if last_used < cutoff:
+                scheduler.cancel_availability_prefetch(session)
+                scheduler.release_hold(session)
+                del self._sessions[session_id]
+
+    def _session(self, session_id):
+        if session_id not in self._sessions:
+            # Started on another process, or before a restart
+            session = scheduler.SchedulingSession(session_id=session_id)
+            if not session_store.restore(session, session_id, self._store):
+                raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown session")
+            self._sessions[session_id] = (session, asyncio.Lock(), self._clock())
+        session, lock, _ = self._sessions[session_id]
+        self._sessions[session_id] = (session, lock, self._clock())
+        return session, lock
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _message(self, session, payload):
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'text' is required")
+        notices = []
+        reply = await self._run(
+            scheduler.process_user_input, session, text, lambda level, message: notices.append({"level": level, "message": message})
+        )
+        return {"reply": reply, "notices": notices}
+
+    async def _confirm(self, session):
+        if session.step == "scheduling":
+            # Saved mid-confirmation by a worker that went away; resuming never inserts twice
+            job = await self._run(scheduler.resume_confirmation, session)
+        elif session.step == "confirm_scheduling":
+            job = await self._run(scheduler.confirm, session)
+        else:
+            raise HTTPError(HTTPStatus.CONFLICT, f"Nothing to confirm in step '{session.step}'")
+        if job is None:
+            raise HTTPError(HTTPStatus.CONFLICT, scheduler.SLOT_TAKEN_REPLY)
+        while not job.finished:
+            await asyncio.sleep(scheduler.CONFIRM_POLL_SECONDS)
+        reply = scheduler.finish_confirmation(session, job)
+        return {
+            "reply": reply,
+            "scheduled": job.event_error is None,
+            "event_link": (job.event_result or {}).get("htmlLink"),
+            "email_link": job.email_link if job.event_error is None else None,
+        }
+
+    async def handle(self, method, path, payload):
+        """Dispatch one request; returns ``(status, body)``"""
+        self._evict_idle()
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["sessions"] and method == "POST":
+            session = scheduler.SchedulingSession()
+            self._sessions[session.session_id] = (session, asyncio.Lock(), self._clock())
+            await self._run(session_store.save, session, self._store)
+            return HTTPStatus.CREATED, {"reply": scheduler.CLI_INTRO, **session.snapshot()}
+        if len(parts) < 2 or parts[0] != "sessions":
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Not found")
+
+        session, lock = self._session(parts[1])
+        action = parts[2] if len(parts) > 2 else None
+        async with lock:
+            await self._run(session_store.refresh, session, self._store)  # Another process may have moved it on
+            if action is None and method == "GET":
+                return HTTPStatus.OK, session.snapshot()
+            if action is None and method == "DELETE":
+                scheduler.cancel_availability_prefetch(session)
+                scheduler.release_hold(session)
+                del self._sessions[session.session_id]
+                await self._run(self._store.delete, session.session_id)
+                return HTTPStatus.OK, {"deleted": session.session_id}
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed")
+            if action == "messages":
+                result = await self._message(session, payload)
+            elif action == "confirm":
+                result = await self._confirm(session)
+            elif action == "change-date":
+                result = {"reply": scheduler.change_date(session)}
+            elif action == "reset":
+                scheduler.reset(session)
+                result = {"reply": scheduler.CLI_INTRO}
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "Not found")
+            await self._run(session_store.save, session, self._store)
+        return HTTPStatus.OK, {**result, **session.snapshot()}
+
+    # 📌 HTTP/1.1 over asyncio streams
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = None
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    try:
+                        payload = json.loads(body) if body else {}
+                    except ValueError:
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+                    status, response = await self.handle(method, path, payload)
+                except HTTPError as e:
+                    status, response = e.status, {"error": str(e)}
+                except (ValueError, asyncio.IncompleteReadError):
+                    status, response, request = HTTPStatus.BAD_REQUEST, {"error": "Malformed request"}, None
+                except Exception as e:
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+                content = json.dumps(response, default=str).encode("utf-8")
+                # Only a request read in full can keep the connection; an unread body would parse as the next request
+                keep_alive = request is not None and request[2].get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🚀 SchedulAI API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host="127.0.0.1", port=8080):
+    try:
+        asyncio.run(SchedulerAPI().serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,254 @@
+"""Persistent conversation state, so a session survives restarts and can resume on any worker.
+
+A session (``st.session_state`` or a ``SchedulingSession``) is saved as
+zlib-compressed JSON under its ``session_id``. Free slots keep their compact
+``SlotList`` form as raw offset bytes, and futures such as prefetches or
+confirmation jobs are left out. Each save bumps a version number, so a worker
+only has to check the version on every rerun and load the state when another
+worker has saved a newer one.
+
+Sessions are kept in process memory by default. Set ``SCHEDULAI_SESSIONS_DB``
+to a SQLite file shared by every replica to scale out or survive restarts.
+Either way, sessions untouched for ``SCHEDULAI_SESSION_MAX_AGE`` seconds are
+dropped, and the memory store also keeps at most ``SCHEDULAI_SESSION_MEMORY_LIMIT``.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime
+
+import sqlite_util
+from availability import SlotList
+from holds import Hold
+
+SESSIONS_DB = os.environ.get("SCHEDULAI_SESSIONS_DB")
+SESSION_MAX_AGE_SECONDS = float(os.environ.get("SCHEDULAI_SESSION_MAX_AGE", str(7 * 24 * 3600)))
+SESSION_MEMORY_LIMIT = int(os.environ.get("SCHEDULAI_SESSION_MEMORY_LIMIT", "5000"))  # Sessions kept in memory
+PURGE_INTERVAL_SECONDS = 600  # How often a SQLite save also deletes expired sessions
+
+# Saved as-is; values are plain JSON
+PLAIN_FIELDS = (
+    "step", "user_email", "candidate_email", "interview_duration", "confirmation_state",
+    "modification_type", "previous_step", "pending_date", "range_search", "slot_page", "messages",
+    "archived_messages",
+)
+
+
+# 📌 Serialization
+def _slot_json(slot):
+    return {"start": slot["start"].isoformat(), "end": slot["end"].isoformat()} if slot else None
+
+
+def _slot_from_json(value):
+    if value is None:
+        return None
+    return {"start": datetime.fromisoformat(value["start"]), "end": datetime.fromisoformat(value["end"])}
+
+
+def _slots_json(slots):
+    if isinstance(slots, SlotList):
+        return {
+            "base": slots.base.isoformat(),
+            "offsets": base64.b64encode(slots.start_offsets.tobytes()).decode("ascii"),
+            "duration": slots.duration_minutes,
+        }
+    return [_slot_json(slot) for slot in slots]
+
+
+def _slots_from_json(value):
+    if isinstance(value, list):
+        return [_slot_from_json(slot) for slot in value]
+    offsets = array("i")
+    offsets.frombytes(base64.b64decode(value["offsets"]))
+    return SlotList(datetime.fromisoformat(value["base"]), offsets, value["duration"])
+
+
+def _hold_json(hold):
+    if hold is None:
+        return None
+    return {
+        "hold_id": hold.hold_id, "owner": hold.owner, "calendar_ids": list(hold.calendar_ids),
+        "start": hold.start.isoformat(), "end": hold.end.isoformat(), "expires_at": hold.expires_at,
+    }
+
+
+def _hold_from_json(value):
+    if value is None:
+        return None
+    return Hold(
+        value["hold_id"], value["owner"], tuple(value["calendar_ids"]),
+        datetime.fromisoformat(value["start"]), datetime.fromisoformat(value["end"]), value["expires_at"],
+    )
+
+
+def session_json(session):
+    """The persistent part of a session as compact JSON"""
+    state = {name: getattr(session, name) for name in PLAIN_FIELDS if hasattr(session, name)}
+    interview_date = getattr(session, "interview_date", None)
+    working_hours = getattr(session, "working_hours", None)
+    state.update(
+        interview_date=interview_date.isoformat() if interview_date else None,
+        working_hours=list(working_hours) if working_hours else None,
+        free_slots=_slots_json(getattr(session, "free_slots", [])),
+        selected_slot=_slot_json(getattr(session, "selected_slot", None)),
+        hold=_hold_json(getattr(session, "hold", None)),
+    )
+    return json.dumps(state, separators=(",", ":"), ensure_ascii=False)
+
+
+def apply_session_json(session, text):
+    """Set a session's fields from ``session_json`` output"""
+    state = json.loads(text)
+    for name in PLAIN_FIELDS:
+        if name in state:
+            setattr(session, name, state[name])
+    session.interview_date = date.fromisoformat(state["interview_date"]) if state["interview_date"] else None
+    session.working_hours = tuple(state["working_hours"]) if state["working_hours"] else None
+    session.free_slots = _slots_from_json(state["free_slots"])
+    session.selected_slot = _slot_from_json(state["selected_slot"])
+    session.hold = _hold_from_json(state["hold"])
+
+
+# 📌 Stores
+class MemorySessionStore:
+    """Sessions for a single server process; they survive page reloads but not restarts.
+
+    Least recently used first, so saves can drop idle sessions from the front.
+    """
+
+    def __init__(self, max_age=SESSION_MAX_AGE_SECONDS, max_entries=SESSION_MEMORY_LIMIT, clock=time.time):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._clock = clock
+        self._sessions = OrderedDict()  # session id -> (version, blob, last used)
+        self._lock = threading.Lock()
+
+    def load(self, session_id, newer_than=0):
+        """``(version, blob)``, or None if missing, expired or not newer than ``newer_than``"""
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[2] <= now - self.max_age:
+                return None
+            self._sessions[session_id] = (entry[0], entry[1], now)
+            self._sessions.move_to_end(session_id)
+        return entry[:2] if entry[0] > newer_than else None
+
+    def save(self, session_id, blob):
+        """Store a new version; returns its number"""
+        now = self._clock()
+        with self._lock:
+            version = self._sessions.get(session_id, (0,))[0] + 1
+            self._sessions[session_id] = (version, blob, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return version
+
+    def _evict(self, now):
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_entries and oldest[2] > now - self.max_age:
+                break
+            del self._sessions[oldest_id]
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    """Sessions shared by every process using the same SQLite file"""
+
+    def __init__(self, path, max_age=SESSION_MAX_AGE_SECONDS, clock=time.time):
+        self.path = path
+        self.max_age = max_age
+        self._clock = clock
+        self._purged_at = clock()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+                "state BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+            self._purge(connection, self._purged_at)
+
+    def _connect(self):
+        # A connection per call, closed afterwards: sqlite3 connections can't be shared across threads
+        return sqlite_util.connect(self.path, timeout=5)
+
+    def _purge(self, connection, now):
+        connection.execute("DELETE FROM sessions WHERE updated_at <= ?", (now - self.max_age,))
+
+    def load(self, session_id, newer_than=0):
+        # The version check is answered from the primary key; the blob is only read when it changed
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT version, state FROM sessions WHERE session_id = ? AND version > ? AND updated_at > ?",
+                (session_id, newer_than, self._clock() - self.max_age)
+            ).fetchone()
+
+    def save(self, session_id, blob):
+        now = self._clock()
+        with self._connect() as connection:
+            if now - self._purged_at >= PURGE_INTERVAL_SECONDS:
+                self._purged_at = now
+                self._purge(connection, now)
+            connection.execute(
+                "INSERT INTO sessions (session_id, version, state, updated_at) VALUES (?, 1, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET version = version + 1, state = excluded.state, "
+                "updated_at = excluded.updated_at",
+                (session_id, blob, now)
+            )
+            return connection.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def delete(self, session_id):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+session_store = SQLiteSessionStore(SESSIONS_DB) if SESSIONS_DB else MemorySessionStore()
+
+
+# 📌 Loading and saving sessions
+# Each session remembers the version it last saw and a digest of what it last saved
+def restore(session, session_id, store=None):
+    """Load a saved session into ``session``; False if there is none"""
+    entry = (store or session_store).load(session_id)
+    if entry is None:
+        return False
+    session.session_id = session_id
+    _apply(session, *entry)
+    return True
+
+
+def refresh(session, store=None):
+    """Reload the session if another worker saved a newer version since this one last looked"""
+    entry = (store or session_store).load(session.session_id, getattr(session, "store_version", 0))
+    if entry is None:
+        return False
+    _apply(session, *entry)
+    return True
+
+
+def save(session, store=None):
+    """Save the session unless nothing persistent changed since the last save or load"""
+    text = session_json(session).encode("utf-8")
+    digest = hashlib.blake2b(text, digest_size=16).digest()
+    if digest == getattr(session, "store_digest", None):
+        return False
+    session.store_version = (store or session_store).save(session.session_id, zlib.compress(text, 1))
+    session.store_digest = digest
+    return True
+
+
+def _apply(session, version, blob):
+    text = zlib.decompress(blob)
+    apply_session_json(session, text.decode("utf-8"))
+    session.store_version = version
+    session.store_digest = hashlib.blake2b(text, digest_size=16).digest()
@@ -0,0 +1,17 @@
+"""SQLite connections for the stores shared between server processes.
+
+``sqlite3.Connection`` used as a context manager only commits or rolls back;
+it never closes. ``connect`` wraps one transaction in a connection that is
+closed on the way out, so a store opening one per call does not leak file
+handles until garbage collection.
+"""
+import sqlite3
+from contextlib import closing, contextmanager
+
+
+@contextmanager
+def connect(path, **kwargs):
+    """Connection for a single transaction: commits or rolls back, then closes"""
+    with closing(sqlite3.connect(path, **kwargs)) as connection:
+        with connection:
+            yield connection
@@ -0,0 +1,61 @@
+import random
+from datetime import datetime, timedelta
+
+from assignment import assign_slots
+from availability import IST, merge_busy_intervals
+
+DAY = datetime(2030, 1, 7, tzinfo=IST)
+
+
+def hours(start, end):
+    return {"start": DAY + timedelta(hours=start), "end": DAY + timedelta(hours=end)}
+
+
+def inside(start, end, intervals):
+    """True if one free stretch holds the whole slot; touching intervals count as one"""
+    return any(interval["start"] <= start and end <= interval["end"] for interval in merge_busy_intervals(intervals))
+
+
+def test_constrained_candidate_is_not_starved():
+    candidates = {
+        "flexible": {"duration_minutes": 60, "free": [hours(10, 12)]},
+        "narrow": {"duration_minutes": 60, "free": [hours(10, 11)]},
+    }
+    assignments, unassigned = assign_slots(candidates, {"rec": [hours(10, 12)]})
+    assert unassigned == []
+    assert {a.candidate: a.start for a in assignments} == {"narrow": DAY + timedelta(hours=10),
+                                                           "flexible": DAY + timedelta(hours=11)}
+
+
+def test_spread_balances_interviewers():
+    candidates = {f"c{number}": {"duration_minutes": 30, "free": [hours(9, 17)]} for number in range(4)}
+    assignments, _ = assign_slots(candidates, {"a": [hours(9, 17)], "b": [hours(9, 17)]}, objective="spread")
+    assert sorted(a.interviewer for a in assignments) == ["a", "a", "b", "b"]
+
+
+def test_random_assignments_never_overlap():
+    rng = random.Random(7)
+    for _ in range(100):
+        interviewer_free = {
+            name: [hours(start, start + rng.choice([1, 2, 3])) for start in rng.sample(range(8, 18, 3), 2)]
+            for name in ("a", "b")
+        }
+        candidates = {}
+        for number in range(rng.randint(1, 12)):
+            start = rng.randint(8, 18) + rng.choice([0, 0.25, 0.5])
+            candidates[f"c{number}"] = {
+                "duration_minutes": rng.choice([30, 45, 60]),
+                "free": [hours(start, start + rng.choice([0.5, 1, 2, 4]))],
+            }
+
+        assignments, unassigned = assign_slots(candidates, interviewer_free, objective=rng.choice(["pack", "spread"]))
+
+        assert sorted([a.candidate for a in assignments] + unassigned) == sorted(candidates)
+        for assignment in assignments:
+            candidate = candidates[assignment.candidate]
+            assert assignment.end - assignment.start == timedelta(minutes=candidate["duration_minutes"])
+            assert inside(assignment.start, assignment.end, candidate["free"])
+            assert inside(assignment.start, assignment.end, interviewer_free[assignment.interviewer])
+        for name in interviewer_free:
+            booked = sorted((a.start, a.end) for a in assignments if a.interviewer == name)
+            assert all(end <= next_start for (_, end), (next_start, _) in zip(booked, booked[1:]))
@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from availability import IST, SlotList, compute_availability, compute_range_availability, day_window, day_windows
+
+MONDAY = date(2030, 1, 7)
+
+
+def at(day, hour, minute=0):
+    return datetime(2030, 1, day, hour, minute, tzinfo=IST)
+
+
+def starts(slots):
+    return [slot["start"] for slot in slots]
+
+
+def test_limit_is_shared_out_across_the_days():
+    windows = day_windows(MONDAY, MONDAY + timedelta(days=2), (10, 13))
+    result = compute_range_availability({"a": []}, windows, 60, limit=4)
+    assert starts(result["split_slots"]) == [at(7, 10), at(7, 11), at(8, 10), at(9, 10)]
+
+
+def test_best_order_prefers_slots_that_keep_free_blocks_whole():
+    windows = day_windows(MONDAY, MONDAY, (10, 13))
+    earliest = compute_range_availability({"a": []}, windows, 60, limit=2)
+    best = compute_range_availability({"a": []}, windows, 60, limit=2, order="best")
+    assert starts(earliest["split_slots"]) == [at(7, 10), at(7, 11)]
+    assert starts(best["split_slots"]) == [at(7, 10), at(7, 12)]
+
+
+def test_range_slots_avoid_busy_time_and_never_overlap():
+    windows = day_windows(MONDAY, MONDAY + timedelta(days=6), (10, 13))  # Skips the weekend
+    busy = {"a": [{"start": at(7, 10, 30), "end": at(7, 11)}], "b": [{"start": at(8, 9), "end": at(8, 12)}]}
+    result = compute_range_availability(busy, windows, 45, order="best")
+    slots = list(result["split_slots"])
+    assert {slot["start"].date() for slot in slots} == {MONDAY + timedelta(days=offset) for offset in range(5)}
+    for slot in slots:
+        for blocked in busy["a"] + busy["b"]:
+            assert slot["end"] <= blocked["start"] or blocked["end"] <= slot["start"]
+    assert all(first["end"] <= second["start"] for first, second in zip(slots, slots[1:]))
+
+
+def test_slot_list_indexes_and_slices_like_a_list():
+    base = at(7, 9)
+    slots = SlotList(base, [0, 30, 90], 45)
+    assert len(slots) == 3
+    assert slots[1] == {"start": at(7, 9, 30), "end": at(7, 10, 15)}
+    assert slots[-1]["start"] == at(7, 10, 30)
+    assert slots[1:] == [slots[1], slots[2]]
+    assert list(slots) == slots[:]
+    with pytest.raises(IndexError):
+        slots[3]
+
+
+def test_slot_list_round_trips_minute_aligned_slots_only():
+    base = at(7, 9)
+    slots = [{"start": at(7, 9, 5), "end": at(7, 10, 5)}, {"start": at(7, 11), "end": at(7, 12)}]
+    packed = SlotList.from_slots(base, slots, 60)
+    assert isinstance(packed, SlotList) and packed == slots
+    off_grid = [{"start": base + timedelta(seconds=30), "end": base + timedelta(minutes=60, seconds=30)}]
+    unpacked = SlotList.from_slots(base, off_grid, 60)
+    assert unpacked == off_grid and not isinstance(unpacked, SlotList)
+
+
+def test_availability_returns_compact_slots():
+    window_start, window_end = day_window(MONDAY, (9, 17))
+    result = compute_availability({"a": [{"start": at(7, 10), "end": at(7, 16)}]}, window_start, window_end, 30)
+    assert isinstance(result["split_slots"], SlotList)
+    assert starts(result["split_slots"])[0] == at(7, 9) and result["split_slots"][-1]["end"] == at(7, 17)
@@ -0,0 +1,103 @@
+import io
+from datetime import date, datetime
+
+import pytest
+
+import bulk
+from availability import IST
+from freebusy_cache import freebusy_cache
+
+MONDAY = date(2030, 1, 7)
+RECRUITER = "rec@x.com"
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeService:
+    """freebusy().query(body=...) answering from a calendar id -> payload mapping"""
+
+    def __init__(self, calendars):
+        self.calendars = calendars
+        self.bodies = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.bodies.append(body)
+        return FakeRequest({"calendars": {
+            item["id"]: self.calendars.get(item["id"], {"busy": []}) for item in body["items"]
+        }})
+
+
+@pytest.fixture(autouse=True)
+def empty_freebusy_cache():
+    freebusy_cache.clear()
+    yield
+    freebusy_cache.clear()
+
+
+def load(csv_text):
+    return bulk.load_bulk_requests(io.StringIO(csv_text), today=MONDAY)
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute, tzinfo=IST)
+
+
+def test_rows_are_validated_one_by_one():
+    requests = load(
+        "Candidate_Email,Duration,Start_Date,End_Date\n"
+        "A@X.com,45 min,2030-01-08,2030-01-09\n"
+        "not an email,45 min,,\n"
+        "b@x.com,,,\n"
+        "c@x.com,1 hr,2030-01-09,2030-01-08\n"
+        "d@x.com,30,2029-12-01,2029-12-02\n"
+        "e@x.com,1 hr 30 min,,\n"
+    )
+    assert requests["status"].tolist() == [
+        "pending", "invalid email", "invalid duration", "invalid date range", "date in the past", "pending",
+    ]
+    first, last = requests.iloc[0], requests.iloc[-1]
+    assert first["candidate_email"] == "a@x.com" and first["duration_minutes"] == 45
+    assert (first["start_date"], first["end_date"]) == (date(2030, 1, 8), date(2030, 1, 9))
+    assert last["duration_minutes"] == 90 and last["start_date"] == MONDAY  # Defaults to the next working days
+
+
+def test_missing_email_column_is_rejected():
+    with pytest.raises(ValueError):
+        load("email,duration\na@x.com,30\n")
+
+
+def test_plan_gives_every_row_its_own_slot_from_one_freebusy_pass():
+    requests = load(
+        "candidate_email,duration,date\n"
+        + "".join(f"c{number}@x.com,60,2030-01-07\n" for number in range(4))
+    )
+    service = FakeService({
+        RECRUITER: {"busy": [{"start": "2030-01-07T05:30:00Z", "end": "2030-01-07T06:30:00Z"}]},  # 11:00-12:00 IST
+    })
+    plan = bulk.plan_bulk_schedule(service, requests, RECRUITER, working_hours=(10, 14))
+
+    assert len(service.bodies) == 1
+    planned = plan[plan["status"] == "planned"].sort_values("slot_start")
+    assert planned["slot_start"].tolist() == [at(10), at(12), at(13)]  # Packed around the busy hour
+    assert plan["status"].tolist().count("no common free slot") == 1
+
+
+def test_unreadable_calendars_are_reported_per_row():
+    requests = load("candidate_email,duration,date\nok@x.com,30,2030-01-07\nhidden@x.com,30,2030-01-07\n")
+    service = FakeService({"hidden@x.com": {"errors": [{"reason": "notFound"}]}})
+    plan = bulk.plan_bulk_schedule(service, requests, RECRUITER, working_hours=(10, 14))
+    assert plan["status"].tolist() == ["planned", "candidate calendar not accessible"]
+
+    freebusy_cache.clear()
+    service = FakeService({RECRUITER: {"errors": [{"reason": "notFound"}]}})
+    plan = bulk.plan_bulk_schedule(service, requests, RECRUITER, working_hours=(10, 14))
+    assert set(plan["status"]) == {"recruiter calendar not accessible"}
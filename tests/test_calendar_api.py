@@ -0,0 +1,111 @@
+import pytest
+
+from calendar_api import CalendarAPIError, RateLimiter, classify_error, is_retryable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse(dict):
+    def __init__(self, status, **headers):
+        super().__init__(headers)
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """Just the parts of googleapiclient's HttpError that classify_error reads"""
+
+    def __init__(self, status, reason=None):
+        super().__init__(f"<HttpError {status} {reason or ''}>")
+        self.resp = FakeResponse(status)
+        self.error_details = [{"reason": reason}] if reason else []
+
+
+def make_limiter(clock, **options):
+    settings = dict(rate=100, burst=100, calendar_rate=2, calendar_burst=2, max_wait=5, bucket_ttl=60)
+    settings.update(options)
+    settings.setdefault("sleep", clock.sleep)
+    return RateLimiter(clock=clock, **settings)
+
+
+def test_calendar_bucket_waits_once_the_burst_is_spent():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    for _ in range(3):
+        limiter.acquire(["a@x.com"])
+    assert clock.slept == [0.5]  # The third request waits for one token at 2/s
+    limiter.acquire(["b@x.com"])
+    assert clock.slept == [0.5]  # Other calendars have their own bucket
+
+
+def test_acquire_rejects_instead_of_waiting_past_max_wait():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_wait=0.4)
+    limiter.acquire(["a@x.com"])
+    limiter.acquire(["a@x.com"])
+    with pytest.raises(CalendarAPIError) as raised:
+        limiter.acquire(["a@x.com"])  # Would wait 0.5s
+    assert raised.value.kind == "rate_limit" and is_retryable(raised.value)
+    assert limiter.stats()["rejected"] == 1
+    clock.now += 0.5
+    limiter.acquire(["a@x.com"])  # The rejected request gave its token back
+    assert clock.slept == []
+
+
+def test_idle_full_buckets_are_evicted_after_the_ttl():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    for number in range(50):
+        limiter.acquire([f"user{number}@x.com"])
+    assert limiter.stats()["calendars"] == 50
+    clock.now += 30
+    limiter.acquire(["user0@x.com"])
+    assert limiter.stats()["calendars"] == 50  # Not idle long enough yet
+    clock.now += 31
+    limiter.acquire(["new@x.com"])
+    stats = limiter.stats()
+    assert stats["calendars"] == 2 and stats["evicted"] == 49  # user0 was used 31s ago
+
+
+def test_buckets_still_in_debt_are_kept():
+    clock = FakeClock()
+    limiter = make_limiter(clock, calendar_rate=0.01, calendar_burst=1, max_wait=1000, sleep=clock.slept.append)
+    limiter.acquire(["slow@x.com"])
+    limiter.acquire(["slow@x.com"])  # 100s of debt, not slept off
+    assert clock.slept == [100]
+    clock.now += 61
+    limiter.acquire(["other@x.com"])
+    assert limiter.stats()["calendars"] == 2
+    limiter.acquire(["slow@x.com"])
+    assert clock.slept[-1] == pytest.approx(139)  # The debt survived the sweep
+
+
+@pytest.mark.parametrize("status, reason, kind, retryable", [
+    (403, "rateLimitExceeded", "rate_limit", True),
+    (403, "userRateLimitExceeded", "rate_limit", True),
+    (429, None, "rate_limit", True),
+    (403, "quotaExceeded", "quota", False),
+    (403, "dailyLimitExceeded", "quota", False),
+    (403, "forbidden", "permission", False),
+    (404, "notFound", "not_found", False),
+    (503, "backendError", "transient", True),
+    (400, "invalid", "other", False),
+])
+def test_classify_error(status, reason, kind, retryable):
+    error = FakeHttpError(status, reason)
+    assert classify_error(error) == kind
+    assert is_retryable(error) is retryable
+
+
+def test_errors_without_a_status_are_not_retried():
+    assert not is_retryable(ValueError("boom"))
@@ -0,0 +1,22 @@
+import json
+
+from googleapiclient.http import HttpMockSequence
+
+import calendar_discovery
+
+
+def test_documents_are_cached_per_path(tmp_path):
+    first = calendar_discovery.load_discovery_document(str(tmp_path / "first.json"))  # Seeded offline
+    document = json.loads((tmp_path / "first.json").read_text(encoding="utf-8"))
+    document["title"] = "Patched Calendar API"
+    (tmp_path / "second.json").write_text(json.dumps(document), encoding="utf-8")
+
+    second = calendar_discovery.load_discovery_document(str(tmp_path / "second.json"))
+    assert second["title"] == "Patched Calendar API"
+    assert calendar_discovery.load_discovery_document(str(tmp_path / "first.json")) is first
+    assert first["title"] != second["title"]
+
+
+def test_service_builds_from_the_cache_without_network(tmp_path):
+    service = calendar_discovery.build_calendar_service(http=HttpMockSequence([]), path=str(tmp_path / "calendar.json"))
+    assert hasattr(service, "freebusy")
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+from availability import IST
+from calendar_sync import CalendarSync
+
+DAY = (datetime.now(IST) + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HttpError {status}")
+        self.resp = type("Response", (), {"status": status})()
+
+
+class Request:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
+
+
+class FakeCalendar:
+    """events().list that pages through ``pages`` for a full listing and ``deltas`` for a syncToken"""
+
+    def __init__(self, pages, deltas=None):
+        self.pages = pages
+        self.deltas = deltas or {}
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, syncToken=None, pageToken=None, **params):
+        def run():
+            self.calls.append((syncToken, pageToken))
+            if syncToken:
+                outcome = self.deltas[syncToken]
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            page = int(pageToken or 0)
+            response = {"items": self.pages[page]}
+            if page + 1 < len(self.pages):
+                response["nextPageToken"] = str(page + 1)
+            else:
+                response["nextSyncToken"] = "token-1"
+            return response
+        return Request(run)
+
+
+def event(event_id, start_hour, end_hour, **extra):
+    return {
+        "id": event_id,
+        "start": {"dateTime": (DAY + timedelta(hours=start_hour)).isoformat()},
+        "end": {"dateTime": (DAY + timedelta(hours=end_hour)).isoformat()},
+        **extra,
+    }
+
+
+def busy_hours(sync):
+    return [(slot["start"].hour, slot["end"].hour) for slot in sync.busy("rec@x.com", DAY, DAY + timedelta(days=1))]
+
+
+def make_sync(calendar, clock=lambda: 0.0):
+    return CalendarSync(service_factory=lambda: calendar, max_age=30, clock=clock)
+
+
+def test_full_sync_follows_pages_and_skips_events_that_do_not_block():
+    calendar = FakeCalendar([
+        [event("a", 9, 10), event("cancelled", 10, 11, status="cancelled")],
+        [event("free", 11, 12, transparency="transparent"),
+         event("declined", 12, 13, attendees=[{"self": True, "responseStatus": "declined"}]),
+         event("b", 14, 15)],
+    ])
+    sync = make_sync(calendar)
+
+    assert sync.enroll("rec@x.com")
+    assert busy_hours(sync) == [(9, 10), (14, 15)]
+    assert calendar.calls == [(None, None), (None, "1")]
+
+
+def test_delta_sync_applies_cancellations_and_moves():
+    now = [0.0]
+    calendar = FakeCalendar(
+        [[event("a", 9, 10), event("b", 14, 15)]],
+        {"token-1": {"items": [{"id": "a", "status": "cancelled"}, event("b", 16, 17)], "nextSyncToken": "token-2"}},
+    )
+    sync = make_sync(calendar, clock=lambda: now[0])
+    sync.enroll("rec@x.com")
+
+    now[0] = 31  # Older than max_age, so the next lookup syncs first
+    assert busy_hours(sync) == [(16, 17)]
+    assert sync.stats()["delta_syncs"] == 1
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync():
+    calendar = FakeCalendar([[event("a", 9, 10)]], {"token-1": HttpError(410)})
+    sync = make_sync(calendar)
+    sync.enroll("rec@x.com")
+    calendar.pages = [[event("c", 11, 12)]]
+
+    sync.mark_stale("rec@x.com")
+    assert busy_hours(sync) == [(11, 12)]
+    assert sync.stats()["full_syncs"] == 2
+
+
+def test_freebusy_only_calendar_is_not_indexed():
+    class Forbidden(FakeCalendar):
+        def list(self, calendarId, **params):
+            return Request(self.refuse)
+
+        def refuse(self):
+            raise HttpError(403)
+
+    sync = make_sync(Forbidden([]))
+
+    assert not sync.enroll("rec@x.com")
+    assert sync.busy("rec@x.com", DAY, DAY + timedelta(days=1)) is None
+    assert sync.enroll_async("rec@x.com") is None  # Not retried
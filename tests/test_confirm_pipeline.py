@@ -0,0 +1,62 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+import confirm_pipeline
+from availability import IST
+
+SLOT = {"start": datetime(2030, 1, 7, 10, tzinfo=IST), "end": datetime(2030, 1, 7, 11, tzinfo=IST)}
+
+
+class FakeDraft:
+    def __init__(self):
+        self.link = None
+        self.fell_back = None
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Blocks each insert until the test releases it, and records the events inserted"""
+    state = {"release": threading.Event(), "events": [], "error": None, "draft": FakeDraft()}
+
+    def insert(service, recruiter_email, event):
+        state["release"].wait(5)
+        state["events"].append(event)
+        if state["error"] is not None:
+            raise state["error"]
+        return {"id": event.get("id"), "htmlLink": "https://calendar/event"}
+
+    monkeypatch.setattr(confirm_pipeline.resources, "get_calendar_service", lambda: "service")
+    monkeypatch.setattr(confirm_pipeline, "insert_interview_event", insert)
+    monkeypatch.setattr(confirm_pipeline, "start_email_draft", lambda *args: state["draft"])
+    yield state
+    state["release"].set()
+
+
+def wait_for(job):
+    job._insert_future.exception(timeout=5)
+
+
+def test_submit_returns_before_the_insert_finishes(pipeline):
+    job = confirm_pipeline.submit_confirmation("rec@x.com", "cand@x.com", SLOT, 60, event_id="abc123")
+    assert not job.event_done and not job.finished
+    assert job.event_details["time"] == "10:00 to 11:00 IST"
+
+    pipeline["release"].set()
+    wait_for(job)
+    assert job.event_result == {"id": "abc123", "htmlLink": "https://calendar/event"}
+    assert pipeline["events"][0]["id"] == "abc123"
+    assert not job.finished  # Still waiting for the email
+
+    pipeline["draft"].link = "https://mail/default"
+    assert job.finished and job.email_link == "https://mail/default"
+
+
+def test_insert_failure_finishes_the_job_without_the_email(pipeline):
+    pipeline["error"] = RuntimeError("calendar down")
+    pipeline["release"].set()
+    job = confirm_pipeline.submit_confirmation("rec@x.com", "cand@x.com", SLOT, 60)
+    wait_for(job)
+    assert isinstance(job.event_error, RuntimeError) and job.event_result is None
+    assert job.finished
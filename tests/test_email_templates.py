@@ -0,0 +1,97 @@
+from concurrent.futures import Future
+
+import pytest
+
+import email_templates
+from email_cache import EmailTemplateCache
+from email_templates import EmailDraft, EmailMetrics
+
+DETAILS = {"date": "Monday, January 07, 2030", "time": "10:00 to 11:00 IST", "duration": 60, "recruiter": "rec@x.com"}
+LINK = "https://calendar.google.com/calendar/render?action=TEMPLATE"
+TEMPLATE = "Dear Candidate, see you {date} at {time} for {duration} minutes: {calendar_link}"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ManualPool:
+    """Holds the submitted stream until the test runs it"""
+
+    def submit(self, function):
+        self.function = function
+        self.future = Future()
+        return self.future
+
+    def run(self):
+        try:
+            self.future.set_result(self.function())
+        except Exception as error:
+            self.future.set_exception(error)
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    def generate_content(self, prompt, stream, request_options):
+        self.calls += 1
+        return [Chunk(text) for text in self.chunks]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel([TEMPLATE[:20], TEMPLATE[20:]])
+    monkeypatch.setattr(email_templates.resources, "get_model", lambda: fake)
+    return fake
+
+
+def start_draft(clock, cache=None, pool=None):
+    draft = EmailDraft(DETAILS, LINK, "cand@x.com", first_token_seconds=3, deadline_seconds=8,
+                       metrics=EmailMetrics(), cache=cache or EmailTemplateCache(db_path=None), clock=clock)
+    return draft.start(pool or ManualPool())
+
+
+def test_generated_email_within_budget_is_cached_for_the_next_draft(model):
+    clock, pool, cache = Clock(), ManualPool(), EmailTemplateCache(db_path=None)
+    draft = start_draft(clock, cache, pool)
+    assert draft.link is None  # Still inside the budget
+    clock.now = 1
+    pool.run()
+    assert "see%20you%20Monday" in draft.link and draft.fell_back is False
+    assert draft.metrics.stats()["generated"] == 1
+
+    again = start_draft(clock, cache)
+    assert again.link == draft.link and model.calls == 1  # Served from the template cache
+
+
+def test_default_template_after_the_first_token_budget_then_late_swap(model):
+    clock, pool = Clock(), ManualPool()
+    draft = start_draft(clock, pool=pool)
+    clock.now = 3.5
+    assert draft.link == email_templates.default_email_link(DETAILS, LINK, "cand@x.com")
+    assert draft.late_link is None
+
+    pool.run()
+    assert draft.link == email_templates.default_email_link(DETAILS, LINK, "cand@x.com")  # The decision sticks
+    assert "see%20you%20Monday" in draft.late_link
+    assert draft.metrics.stats()["fallbacks"] == 1 and draft.metrics.stats()["late_swaps"] == 1
+
+
+def test_template_missing_placeholders_falls_back(monkeypatch):
+    monkeypatch.setattr(email_templates.resources, "get_model", lambda: FakeModel(["Dear Candidate, see you soon"]))
+    clock, pool = Clock(), ManualPool()
+    draft = start_draft(clock, pool=pool)
+    pool.run()
+    assert draft.link == email_templates.default_email_link(DETAILS, LINK, "cand@x.com")
+    assert draft.stream_finished and draft.late_link is None
@@ -0,0 +1,153 @@
+import json
+
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence
+
+from calendar_api import CalendarAPIError
+from event_writer import EventWriter
+
+BOUNDARY = "batch_boundary"
+
+
+class NoLimit:
+    def acquire(self, calendar_ids):
+        pass
+
+
+class RejectFirst:
+    """Turns away the first ``count`` requests, like a limiter whose wait would exceed max_wait"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def acquire(self, calendar_ids):
+        if self.count:
+            self.count -= 1
+            raise CalendarAPIError("rate_limit", "Too many Calendar requests right now", 429)
+
+
+def batch_response(parts):
+    """A multipart batch reply; ``parts`` maps request id to ``(status, body)``"""
+    chunks = []
+    for request_id, (status, body) in parts.items():
+        chunks.append(
+            f"--{BOUNDARY}\r\nContent-Type: application/http\r\nContent-ID: <response-x + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n{json.dumps(body)}\r\n"
+        )
+    content = "".join(chunks) + f"--{BOUNDARY}--"
+    return {"status": "200", "content-type": f"multipart/mixed; boundary={BOUNDARY}"}, content
+
+
+def error(status):
+    return status, {"error": {"code": status, "message": f"error {status}"}}
+
+
+def make_writer(responses, limiter=None):
+    http = HttpMockSequence(responses)
+    service = build("calendar", "v3", http=http, static_discovery=True, developerKey="test")
+    return EventWriter(service, http=http, sleep=lambda seconds: None, limiter=limiter or NoLimit()), http
+
+
+def sent_ids(http, call):
+    """Request ids inside the ``call``-th batch the writer sent"""
+    body = http.request_sequence[call][2]
+    return [line.split("+")[-1].strip(" >") for line in body.splitlines() if line.startswith("Content-ID")]
+
+
+def sent_events(http, call):
+    """Event bodies inside the ``call``-th batch the writer sent"""
+    return [json.loads(line) for line in http.request_sequence[call][2].splitlines() if line.startswith("{")]
+
+
+def test_partial_failure_retries_only_failed_items():
+    writer, http = make_writer([
+        batch_response({"0": (200, {"id": "a"}), "1": error(503), "2": error(404)}),
+        batch_response({"0": (200, {"id": "b", "htmlLink": "link-b"})}),
+    ])
+    for key in ("first", "second", "third"):
+        writer.insert("rec@x.com", {"summary": key}, key=key)
+
+    results = writer.execute()
+
+    assert sent_ids(http, 0) == ["0", "1", "2"]
+    assert sent_ids(http, 1) == ["0"]  # Only the 503 is sent again
+    assert results["first"].ok and results["first"].attempts == 1
+    assert results["second"].ok and results["second"].attempts == 2
+    assert results["second"].response["htmlLink"] == "link-b"
+    assert not results["third"].ok and results["third"].attempts == 1
+
+
+def test_batch_level_error_is_recorded_per_item_and_retried():
+    writer, http = make_writer([
+        ({"status": "503"}, "unavailable"),
+        batch_response({"0": (200, {"id": "a"}), "1": (200, {"id": "b"})}),
+    ])
+    writer.insert("rec@x.com", {"summary": "one"}, key="one")
+    writer.insert("rec@x.com", {"summary": "two"}, key="two")
+
+    results = writer.execute()
+
+    assert results["one"].ok and results["two"].ok
+    assert results["one"].attempts == 2
+
+
+def test_batch_level_error_without_retries_left_does_not_escape():
+    writer, http = make_writer([({"status": "503"}, "unavailable")])
+    writer.max_retries = 0
+    writer.insert("rec@x.com", {"summary": "one"}, key="one")
+
+    result = writer.execute()["one"]
+
+    assert not result.ok
+    assert "503" in str(result.error)
+
+
+def test_retried_insert_that_already_landed_returns_the_existing_event():
+    writer, http = make_writer([
+        batch_response({"0": error(503)}),
+        batch_response({"0": error(409)}),
+        batch_response({"0": (200, {"id": "evt", "htmlLink": "link"})}),
+    ])
+    writer.insert("rec@x.com", {"summary": "one"}, key="one")
+
+    result = writer.execute()["one"]
+
+    assert result.ok
+    assert result.response["htmlLink"] == "link"
+    first, second = sent_events(http, 0)[0], sent_events(http, 1)[0]
+    assert first["id"] and first["id"] == second["id"]  # Resent under the same client-generated id
+    assert f"GET /calendar/v3/calendars/rec%40x.com/events/{first['id']}" in http.request_sequence[2][2]
+
+
+def test_insert_keeps_an_id_the_caller_set():
+    writer, http = make_writer([batch_response({"0": (200, {"id": "given"})})])
+    writer.insert("rec@x.com", {"summary": "one", "id": "given"}, key="one")
+    writer.execute()
+    assert sent_events(http, 0)[0]["id"] == "given"
+
+
+def test_limiter_rejection_is_recorded_per_item_and_retried():
+    writer, http = make_writer([
+        batch_response({"1": (200, {"id": "b"})}),
+        batch_response({"0": (200, {"id": "a"})}),
+    ], limiter=RejectFirst(1))
+    writer.insert("rec@x.com", {"summary": "one"}, key="one")
+    writer.insert("rec@x.com", {"summary": "two"}, key="two")
+
+    results = writer.execute()
+
+    assert sent_ids(http, 0) == ["1"]  # The rejected item was never added to the batch
+    assert sent_ids(http, 1) == ["0"]
+    assert results["one"].ok and results["one"].attempts == 2
+    assert results["two"].ok and results["two"].attempts == 1
+
+
+def test_items_the_limiter_keeps_rejecting_still_get_a_result():
+    writer, http = make_writer([], limiter=RejectFirst(10))
+    writer.max_retries = 1
+    writer.insert("rec@x.com", {"summary": "one"}, key="one")
+
+    result = writer.execute()["one"]
+
+    assert not result.ok and result.error.kind == "rate_limit"
+    assert http.request_sequence == []
@@ -0,0 +1,99 @@
+from freebusy_cache import FreeBusyCache, cached_freebusy_query
+
+DAY_START, DAY_END = "2030-01-07T00:00:00Z", "2030-01-08T00:00:00Z"
+MORNING = {"start": "2030-01-07T09:00:00Z", "end": "2030-01-07T10:00:00Z"}
+EVENING = {"start": "2030-01-07T18:00:00Z", "end": "2030-01-07T19:00:00Z"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeService:
+    """freebusy().query(body=...) that answers from ``busy`` and records each body sent"""
+
+    def __init__(self, busy):
+        self.busy = busy
+        self.bodies = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.bodies.append(body)
+        return FakeRequest({"calendars": {item["id"]: {"busy": self.busy[item["id"]]} for item in body["items"]}})
+
+
+def test_covering_window_answers_a_trimmed_sub_range():
+    cache = FreeBusyCache(clock=Clock())
+    cache.put("a@x.com", DAY_START, DAY_END, {"busy": [MORNING, EVENING]})
+    assert cache.get("a@x.com", "2030-01-07T08:00:00Z", "2030-01-07T12:00:00Z") == {"busy": [MORNING]}
+    assert cache.get("a@x.com", "2030-01-07T11:00:00Z", "2030-01-07T12:00:00Z") == {"busy": []}
+    assert cache.get("a@x.com", "2030-01-06T23:00:00Z", "2030-01-07T12:00:00Z") is None  # Not covered
+    assert cache.get("b@x.com", DAY_START, DAY_END) is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+
+def test_errors_are_returned_untrimmed():
+    cache = FreeBusyCache(clock=Clock())
+    payload = {"errors": [{"reason": "notFound"}], "busy": []}
+    cache.put("a@x.com", DAY_START, DAY_END, payload)
+    assert cache.get("a@x.com", DAY_START, "2030-01-07T12:00:00Z") == payload
+
+
+def test_entries_expire_after_the_ttl():
+    clock = Clock()
+    cache = FreeBusyCache(ttl_seconds=60, clock=clock)
+    cache.put("a@x.com", DAY_START, DAY_END, {"busy": [MORNING]})
+    clock.now = 60
+    assert cache.get("a@x.com", DAY_START, DAY_END) is not None
+    clock.now = 61
+    assert cache.get("a@x.com", DAY_START, DAY_END) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FreeBusyCache(max_entries=2, clock=Clock())
+    for calendar_id in ("a@x.com", "b@x.com"):
+        cache.put(calendar_id, DAY_START, DAY_END, {"busy": []})
+    cache.get("a@x.com", DAY_START, DAY_END)  # b is now the oldest
+    cache.put("c@x.com", DAY_START, DAY_END, {"busy": []})
+    assert cache.get("b@x.com", DAY_START, DAY_END) is None
+    assert cache.get("a@x.com", DAY_START, DAY_END) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_drops_only_that_calendar():
+    cache = FreeBusyCache(clock=Clock())
+    cache.put("a@x.com", DAY_START, DAY_END, {"busy": []})
+    cache.put("b@x.com", DAY_START, DAY_END, {"busy": []})
+    cache.invalidate("a@x.com")
+    assert cache.get("a@x.com", DAY_START, DAY_END) is None
+    assert cache.get("b@x.com", DAY_START, DAY_END) is not None
+
+
+def test_query_sends_only_the_calendars_missing_from_the_cache():
+    cache = FreeBusyCache(clock=Clock())
+    service = FakeService({"a@x.com": [MORNING], "b@x.com": [EVENING]})
+    body = {"timeMin": DAY_START, "timeMax": DAY_END, "items": [{"id": "a@x.com"}]}
+    cached_freebusy_query(service, body, cache)
+
+    body = {"timeMin": "2030-01-07T12:00:00Z", "timeMax": DAY_END, "items": [{"id": "a@x.com"}, {"id": "b@x.com"}]}
+    result = cached_freebusy_query(service, body, cache)
+    assert [item["id"] for item in service.bodies[-1]["items"]] == ["b@x.com"]
+    assert result["calendars"] == {"a@x.com": {"busy": []}, "b@x.com": {"busy": [EVENING]}}
+
+    cached_freebusy_query(service, body, cache)
+    assert len(service.bodies) == 2  # Everything answered from the cache
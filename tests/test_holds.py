@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from availability import IST
+from holds import MemoryHoldStore, SQLiteHoldStore
+
+START = datetime(2030, 1, 7, 10, 0, tzinfo=IST)
+END = START + timedelta(minutes=30)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    now = [1000.0]
+
+    def make(hold_seconds=300):
+        clock = lambda: now[0]
+        if request.param == "memory":
+            return MemoryHoldStore(hold_seconds, clock)
+        return SQLiteHoldStore(str(tmp_path / "holds.db"), hold_seconds, clock)
+
+    make.now = now
+    make.kind = request.param
+    return make
+
+
+def test_overlapping_hold_by_another_owner_is_refused(make_store):
+    store = make_store()
+    hold = store.acquire("a", ["rec@x.com", "c1@y.com"], START, END)
+
+    assert hold is not None and store.is_active(hold)
+    assert store.acquire("b", ["rec@x.com", "c2@y.com"], START + timedelta(minutes=15), END) is None
+    assert store.acquire("b", ["rec@x.com"], END, END + timedelta(minutes=30)) is not None  # Touching is fine
+    assert store.acquire("c", ["other@x.com"], START, END) is not None  # Different calendars
+    assert store.metrics.stats()["conflicts"] == 1
+
+
+def test_held_intervals_hide_other_owners_holds_only(make_store):
+    store = make_store()
+    store.acquire("a", ["rec@x.com"], START, END)
+
+    assert store.held_intervals("rec@x.com", START - timedelta(hours=1), END, exclude_owner="b") == [
+        {"start": START, "end": END}
+    ]
+    assert store.held_intervals("rec@x.com", START - timedelta(hours=1), END, exclude_owner="a") == []
+
+
+def test_holds_expire(make_store):
+    store = make_store(hold_seconds=60)
+    hold = store.acquire("a", ["rec@x.com"], START, END)
+
+    make_store.now[0] += 61
+    assert not store.is_active(hold)
+    assert store.held_intervals("rec@x.com", START, END) == []
+    assert store.acquire("b", ["rec@x.com"], START, END) is not None
+
+
+def test_release_and_extend(make_store):
+    store = make_store(hold_seconds=60)
+    hold = store.acquire("a", ["rec@x.com"], START, END)
+
+    store.extend(hold, 600)
+    make_store.now[0] += 120
+    assert store.is_active(hold)
+
+    store.release(hold)
+    assert not store.is_active(hold)
+    assert store.acquire("b", ["rec@x.com"], START, END) is not None
+    assert store.metrics.stats()["released"] == 1
+
+
+def test_concurrent_acquires_have_one_winner(make_store):
+    # Two SQLite stores on one file stand in for two processes; memory holds are per process
+    stores = [make_store(), make_store()] if make_store.kind == "sqlite" else [make_store()] * 2
+    winners = []
+
+    def race(i):
+        if stores[i % 2].acquire(f"owner{i}", ["rec@x.com", f"c{i}@y.com"], START, END):
+            winners.append(i)
+
+    threads = [threading.Thread(target=race, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(winners) == 1
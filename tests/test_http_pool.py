@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+
+import pytest
+
+from http_pool import HttpPool, _start_stub_server
+
+
+class FakeHttp:
+    """Records how many threads are inside ``request`` at once"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.005)
+        with self._lock:
+            self.active -= 1
+        if uri == "fail":
+            raise ConnectionError("reset")
+        return {"status": "200"}, b"{}"
+
+    def close(self):
+        self.closed = True
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_clients_are_never_shared_and_never_exceed_the_pool_size():
+    clients = []
+    pool = HttpPool(size=3, http_factory=lambda: clients.append(FakeHttp()) or clients[-1])
+
+    run_threads(lambda: [pool.request("ok") for _ in range(5)], 10)
+
+    assert len(clients) == 3
+    assert all(client.max_active == 1 for client in clients)
+    assert pool.stats()["requests"] == 50
+    assert pool.stats()["idle"] == 3
+
+
+def test_failed_request_closes_its_client_and_returns_it():
+    client = FakeHttp()
+    pool = HttpPool(size=1, http_factory=lambda: client)
+
+    with pytest.raises(ConnectionError):
+        pool.request("fail")
+
+    assert client.closed
+    assert pool.request("ok")[0]["status"] == "200"
+
+
+def test_keep_alive_connections_are_reused_against_a_stub_server():
+    server, connections = _start_stub_server(latency_seconds=0.01)
+    pool = HttpPool(size=2)
+    uri = f"http://127.0.0.1:{server.server_address[1]}/calendar/v3/freeBusy"
+    try:
+        run_threads(lambda: [pool.request(uri, "POST", body="{}") for _ in range(5)], 6)
+
+        response, content = pool.request(uri, "POST", body="{}")
+        assert response.status == 200 and json.loads(content)["kind"] == "calendar#freeBusy"
+        assert len(connections) <= 2  # One TCP connection per pooled client
+        assert pool.stats()["created"] == 2
+    finally:
+        pool.close()
+        server.shutdown()
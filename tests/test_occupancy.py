@@ -0,0 +1,56 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from availability import compute_availability, day_window
+from occupancy import compute_availability_bitmap
+
+
+def random_case(rng, aligned=True):
+    day = date(2030, 1, 7) + timedelta(days=rng.randint(0, 4))
+    working_hours = rng.choice([None, None, (9, 17), (10, 18)])
+    window_start, window_end = day_window(day, working_hours)  # A full day ends at 23:59:59.999999
+    if not aligned:
+        window_start += timedelta(seconds=rng.randint(1, 59))
+    busy = {}
+    for attendee in ("a", "b", "c"):
+        slots = []
+        for _ in range(rng.randint(0, 5)):
+            start = window_start + timedelta(minutes=rng.randint(-120, 1500))
+            if not aligned and rng.random() < 0.5:
+                start += timedelta(seconds=rng.randint(1, 59))
+            slots.append({"start": start, "end": start + timedelta(minutes=rng.randint(5, 300))})
+        busy[attendee] = slots
+    options = {"working_hours": working_hours}
+    if rng.random() < 0.3:
+        options.update(required=["a"], optional=["b", "c"], quorum=1)
+    return busy, window_start, window_end, rng.choice([15, 30, 45, 60, 90]), options
+
+
+@pytest.mark.parametrize("aligned", [True, False])
+def test_bitmap_matches_sweep_on_random_windows(aligned):
+    rng = random.Random(20261017 + aligned)
+    ran = 0
+    for _ in range(500):
+        busy, window_start, window_end, duration, options = random_case(rng, aligned)
+        bitmap = compute_availability_bitmap(busy, window_start, window_end, duration, **options)
+        sweep = compute_availability(busy, window_start, window_end, duration, engine="sweep", **options)
+        if bitmap is None:
+            continue  # Not representable on a minute grid; the caller falls back to the sweep
+        ran += 1
+        assert bitmap["common_free_slots"] == sweep["common_free_slots"]
+        assert list(bitmap["split_slots"]) == list(sweep["split_slots"])
+    if aligned:
+        assert ran == 500  # Including full days whose busy blocks cross midnight
+    else:
+        assert ran > 0
+
+
+def test_full_day_with_a_block_past_midnight_uses_the_bitmap():
+    window_start, window_end = day_window(date(2030, 1, 7))
+    late = window_start + timedelta(hours=23)
+    busy = {"a": [{"start": late, "end": late + timedelta(hours=3)}]}
+    result = compute_availability_bitmap(busy, window_start, window_end, 30)
+    assert result is not None
+    assert result["common_free_slots"][-1]["end"] == late
@@ -0,0 +1,136 @@
+from datetime import date
+
+import pytest
+
+import parsers
+
+TODAY = date(2026, 10, 17)  # A Saturday
+
+
+@pytest.mark.parametrize("text", ["cand@x.com 45", "cand@x.com for 90", "at 3pm", "b@y.com 10:30", "c@x.com at 3 pm"])
+def test_bare_numbers_and_clock_times_are_not_dates(text):
+    intent = parsers.extract_intent(text, TODAY)
+    assert intent["date_text"] is None and intent["date"] is None and intent["date_range"] is None
+
+
+def test_number_with_a_unit_is_the_duration():
+    intent = parsers.extract_intent("cand@x.com 45 min", TODAY)
+    assert intent["duration"] == 45
+    assert intent["date_text"] is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a@x.com b@y.com next tuesday", date(2026, 10, 20)),
+    ("a@x.com b@y.com tomorrow at 3pm", date(2026, 10, 18)),
+    ("a@x.com b@y.com 25/03/2027", date(2027, 3, 25)),
+    ("a@x.com b@y.com 2027-04-01", date(2027, 4, 1)),
+])
+def test_real_dates_are_found(text, expected):
+    assert parsers.extract_intent(text, TODAY)["date"] == expected
+
+
+def test_whole_request_in_one_message():
+    intent = parsers.extract_intent("schedule a@x.com with b@y.com for 45 min next Tuesday 10am-6pm", TODAY)
+    assert intent["emails"] == ["a@x.com", "b@y.com"]
+    assert intent["duration"] == 45
+    assert intent["working_hours"] == (10, 18)
+    assert intent["date"] == date(2026, 10, 20)
+
+
+def test_ordinal_range_is_found():
+    intent = parsers.extract_intent("a@x.com b@y.com any day before the 30th", TODAY)
+    assert intent["date_range"] == (TODAY, date(2026, 10, 29))
+
+
+class FakeToken:
+    def __init__(self, text):
+        self.text = text
+        self.like_email = "@" in text and "." in text.split("@")[-1]
+
+
+class FakeDoc:
+    def __init__(self, text):
+        self.ents = []
+        self.tokens = [FakeToken(word) for word in text.split()]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+
+class FakeNLP:
+    """Stands in for spaCy: one doc per text, with email-like tokens and no entities"""
+
+    pipe_names = ["tok2vec", "tagger", "parser", "ner", "lemmatizer"]
+
+    def __init__(self):
+        self.texts = []
+        self.disabled = None
+
+    def _doc(self, text):
+        self.texts.append(text)
+        return FakeDoc(text)
+
+    def __call__(self, text, disable=()):
+        self.disabled = disable
+        return self._doc(text)
+
+    def pipe(self, texts, batch_size=64, disable=()):
+        self.disabled = disable
+        return [self._doc(text) for text in texts]
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    fake = FakeNLP()
+    monkeypatch.setattr(parsers.resources, "get_nlp", lambda: fake)
+    return fake
+
+
+def test_plain_emails_never_load_spacy(nlp):
+    text = "Recruiter A@X.com and candidate b@y.co.in, cc a@x.com"
+    assert parsers.extract_emails(text) == ["a@x.com", "b@y.co.in"]
+    assert nlp.texts == []
+
+
+def test_ambiguous_text_falls_back_to_the_entity_recognizer_only(nlp):
+    assert parsers.extract_emails("reach me @ the usual place") == []
+    assert nlp.texts == ["reach me @ the usual place"]
+    assert nlp.disabled == ["tagger", "parser", "lemmatizer"]
+
+
+def test_batch_runs_nlp_over_the_ambiguous_texts_only(nlp):
+    texts = ["a@x.com", "no address here", "mail @ home", "B@Y.com b@y.com"]
+    assert parsers.extract_emails_batch(texts) == [["a@x.com"], [], [], ["b@y.com"]]
+    assert nlp.texts == ["mail @ home"]
+
+
+def test_parsers_memoize_on_normalized_text():
+    parsers._duration.cache_clear()
+    parsers._working_hours.cache_clear()
+    assert parsers.extract_duration("1 hr 30 min") == 90
+    assert parsers.extract_duration("  1 HR   30 MIN ") == 90
+    assert parsers._duration.cache_info().hits == 1
+    assert parsers.extract_working_hours("9 am to 5 pm") == (9, 17)
+    assert parsers.extract_working_hours("9 AM TO 5 PM") == (9, 17)
+    assert parsers._working_hours.cache_info().hits == 1
+
+
+def test_date_caches_are_cleared_when_the_day_changes(monkeypatch):
+    class FakeDate(date):
+        current = TODAY
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr(parsers, "date", FakeDate)
+    monkeypatch.setattr(parsers, "_cache_day", None)
+    saturday = parsers.extract_date_range("next 3 days")
+    assert saturday == (TODAY, date(2026, 10, 19))
+    assert parsers.extract_date_range("next 3 days") == saturday
+    assert parsers._date_range.cache_info().currsize >= 1
+
+    FakeDate.current = date(2026, 10, 18)
+    parsers._today()
+    assert parsers._date_range.cache_info().currsize == 0
+    assert parsers.extract_date_range("next 3 days") == (date(2026, 10, 18), date(2026, 10, 20))
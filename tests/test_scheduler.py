@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import scheduler
+from availability import IST, SlotList
+
+
+def session_with_slots(count):
+    session = scheduler.SchedulingSession()
+    session.free_slots = SlotList(datetime(2030, 1, 7, 9, tzinfo=IST), range(0, count * 15, 15), 15)
+    return session
+
+
+def test_slots_are_listed_a_page_at_a_time(monkeypatch):
+    monkeypatch.setattr(scheduler, "SLOT_PAGE_SIZE", 10)
+    session = session_with_slots(25)
+    first = scheduler.show_slots(session)
+    assert first.startswith("1. 09:00 to 09:15")
+    assert "Showing 1-10 of 25. Type **more** for later slots." in first
+
+    last = scheduler.show_slots(session, pages=5)  # Clamped to the last page
+    assert session.slot_page == 2
+    assert "21. 14:00 to 14:15" in last and "Showing 21-25 of 25. Type **back** for earlier ones." in last
+
+    middle = scheduler.show_slots(session, pages=-1)
+    assert "Showing 11-20 of 25. Type **more** for later slots or **back** for earlier ones." in middle
+    assert "(1-25)" in middle
+
+
+def test_a_single_page_has_no_paging_hint(monkeypatch):
+    monkeypatch.setattr(scheduler, "SLOT_PAGE_SIZE", 10)
+    session = session_with_slots(3)
+    session.range_search = True
+    text = scheduler.slot_page_text(session)
+    assert text.splitlines() == ["1. Mon 07 Jan, 09:00 to 09:15", "2. Mon 07 Jan, 09:15 to 09:30",
+                                 "3. Mon 07 Jan, 09:30 to 09:45"]
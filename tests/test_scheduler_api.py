@@ -0,0 +1,39 @@
+import asyncio
+
+import session_store
+from scheduler_api import MAX_BODY_BYTES, SchedulerAPI
+
+
+def exchange(raw):
+    """Send raw bytes on one connection and read until the server closes it"""
+    async def run():
+        api = SchedulerAPI(workers=2, store=session_store.MemorySessionStore())
+        server = await asyncio.start_server(api._handle_connection, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        writer.write(raw)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        server.close()
+        return data.decode("latin-1")
+    return asyncio.run(run())
+
+
+def test_keep_alive_serves_several_requests():
+    data = exchange(
+        b"POST /sessions HTTP/1.1\r\nContent-Length: 0\r\n\r\n"
+        b"GET /sessions/missing HTTP/1.1\r\nConnection: close\r\n\r\n"
+    )
+    assert data.count("HTTP/1.1 ") == 2
+    assert data.startswith("HTTP/1.1 201")
+    assert "HTTP/1.1 404" in data  # And the error response honours Connection: close
+
+
+def test_oversized_body_closes_the_connection_instead_of_parsing_it():
+    smuggled = b"POST /sessions HTTP/1.1\r\nContent-Length: 0\r\n\r\n"
+    data = exchange(
+        f"POST /sessions HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n".encode("latin-1") + smuggled
+    )
+    assert data.count("HTTP/1.1 ") == 1  # The body was never read as a second request
+    assert data.startswith("HTTP/1.1 413")
+    assert "Connection: close" in data
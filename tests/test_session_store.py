@@ -0,0 +1,117 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import session_store
+from availability import IST, SlotList
+from holds import Hold
+from scheduler import SchedulingSession
+
+BASE = datetime(2030, 1, 7, 9, 0, tzinfo=IST)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return session_store.MemorySessionStore()
+    return session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def scheduled_session():
+    session = SchedulingSession(
+        step="scheduling", user_email="rec@x.com", candidate_email="c@y.com", interview_duration=30,
+        interview_date=date(2030, 1, 7), working_hours=(9, 17), range_search=True, slot_page=1,
+        confirmation_state={"event_id": "abc123"}, pending_date="next tuesday",
+    )
+    session.free_slots = SlotList(BASE, [0, 30, 60, 24 * 60], 30)
+    session.selected_slot = session.free_slots[1]
+    session.hold = Hold("h1", session.session_id, ("rec@x.com", "c@y.com"), BASE, BASE + timedelta(minutes=30), 5.0)
+    session.messages = [{"role": "user", "content": "schedule ✅"}]
+    session.archived_messages = [{"id": None, "line": "🧑 hi"}]
+    return session
+
+
+def test_round_trip_keeps_every_persistent_field(store):
+    saved = scheduled_session()
+    assert session_store.save(saved, store)
+
+    restored = SchedulingSession()
+    assert session_store.restore(restored, saved.session_id, store)
+
+    for name in session_store.PLAIN_FIELDS + ("interview_date", "working_hours", "selected_slot", "hold"):
+        assert getattr(restored, name) == getattr(saved, name), name
+    assert isinstance(restored.free_slots, SlotList)
+    assert list(restored.free_slots) == list(saved.free_slots)
+    assert restored.step == "scheduling"  # Resumed under the saved event id, never confirmed twice
+
+
+def test_plain_slot_lists_round_trip(store):
+    saved = SchedulingSession(step="select_slot")
+    saved.free_slots = [{"start": BASE + timedelta(seconds=30), "end": BASE + timedelta(minutes=30, seconds=30)}]
+    session_store.save(saved, store)
+
+    restored = SchedulingSession()
+    session_store.restore(restored, saved.session_id, store)
+    assert restored.free_slots == saved.free_slots
+
+
+def test_unchanged_sessions_are_not_saved_again(store):
+    session = scheduled_session()
+    assert session_store.save(session, store)
+    assert not session_store.save(session, store)
+    session.slot_page = 0
+    assert session_store.save(session, store)
+    assert session.store_version == 2
+
+
+def test_refresh_loads_only_newer_versions(store):
+    first = scheduled_session()
+    session_store.save(first, store)
+    second = SchedulingSession()
+    session_store.restore(second, first.session_id, store)
+
+    assert not session_store.refresh(first, store)
+    second.step = "done"
+    session_store.save(second, store)
+    assert session_store.refresh(first, store)
+    assert first.step == "done"
+
+
+def test_unknown_and_deleted_sessions_do_not_restore(store):
+    session = scheduled_session()
+    session_store.save(session, store)
+    store.delete(session.session_id)
+
+    assert not session_store.restore(SchedulingSession(), session.session_id, store)
+    assert not session_store.restore(SchedulingSession(), "missing", store)
+
+
+def test_memory_store_evicts_least_recently_used_and_idle_sessions():
+    now = [0.0]
+    store = session_store.MemorySessionStore(max_age=100, max_entries=2, clock=lambda: now[0])
+    store.save("a", b"1")
+    store.save("b", b"2")
+    store.load("a")
+    store.save("c", b"3")  # Over the limit: "b" was used least recently
+    assert store.load("b") is None
+    assert store.load("a") == (1, b"1")
+
+    now[0] = 150
+    assert store.load("c") is None  # Idle past max_age
+    store.save("d", b"4")
+    assert list(store._sessions) == ["d"]
+
+
+def test_sqlite_store_purges_expired_sessions_on_save(tmp_path):
+    now = [0.0]
+    path = str(tmp_path / "sessions.db")
+    store = session_store.SQLiteSessionStore(path, max_age=100, clock=lambda: now[0])
+    store.save("old", b"1")
+
+    now[0] = 150
+    assert store.load("old") is None
+    now[0] = session_store.PURGE_INTERVAL_SECONDS + 1
+    store.save("new", b"2")
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT session_id FROM sessions").fetchall() == [("new",)]